@@ -9,14 +9,43 @@ Author: AnarQorp Team
 
 import os
 import sys
+import argparse
 import subprocess
 import shutil
+import signal
+import socket
 import json
+import io
+import hashlib
+import base64
+import urllib.error
+import urllib.parse
 import urllib.request
+import http.client
 import zipfile
-import tempfile
+import tarfile
+import zlib
+import struct
+import ssl
+import random
+import threading
+import queue
+import time
+import atexit
+import collections
+import platform
+import fnmatch
+import cProfile
+import pstats
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
 
 try:
     import tkinter as tk
@@ -32,48 +61,1851 @@ CONFIG = {
     'core_repo': 'https://github.com/AnarQorp/anarqq-ecosystem-core.git',
     'demo_zip': 'https://github.com/AnarQorp/anarqq-ecosystem-demo/archive/refs/heads/main.zip',
     'core_zip': 'https://github.com/AnarQorp/anarqq-ecosystem-core/archive/refs/heads/main.zip',
+    'repo_branch': 'main',
+    # Git clone strategy: 'full', 'shallow' (depth 1), 'blobless' (--filter=blob:none)
+    # or 'sparse' (shallow, blobless and limited to the install profile)
+    'clone_strategy': 'shallow',
+    # Parts of each repository to install, as git non-cone sparse-checkout
+    # patterns (gitignore syntax, last match wins); used for ZIP extraction too
+    'install_profile': 'full',
+    'install_profiles': {
+        # Root files plus what the demo needs to build and run
+        'minimal': {
+            'include': ['/*', '!/*/', '/src/', '/public/', '/backend/', '/libs/',
+                        '/modules/', '/config/', '/scripts/'],
+            'exclude': ['docs/', '.kiro/', 'tests/', '__tests__/', '*.test.*', '*.spec.*',
+                        '*.tar.gz', '*.tgz', '*.zip'],
+        },
+        # Everything needed to work on the code, without specs and release artifacts
+        'developer': {
+            'include': ['/*'],
+            'exclude': ['.kiro/', '*.tar.gz', '*.tgz', '*.zip'],
+        },
+        'full': {'include': ['/*'], 'exclude': []},
+    },
     'min_node_version': '18.0.0',
     'min_python_version': '3.8.0',
     'required_disk_gb': 5,
-    'required_memory_gb': 2
+    'required_memory_gb': 2,
+    'disk_probe_mb': 32,
+    # Steps running at once per resource kind (fetches and npm installs are
+    # mostly I/O, builds are CPU-bound); 0 uses the host's tuning profile
+    'step_budget': {'io': 0, 'cpu': 0},
+    # Archives the streaming extractor rejects go to a process pool unless
+    # they are below either threshold, which are extracted in-process
+    'parallel_extract_min_files': 200,
+    'parallel_extract_min_mb': 16,
+    'probe_timeout': 10,
+    'download_retries': 5,
+    # Retries back off exponentially from base to max seconds, with jitter
+    'http_backoff_base': 0.5,
+    'http_backoff_max': 30,
+    # Idle keep-alive connections kept per host
+    'http_pool_size': 8,
+    'download_timeout': 30,
+    'download_chunk_size': 256 * 1024,
+    # A single stream is hashed and extracted while it arrives; more connections
+    # fetch byte ranges in parallel and are read back afterwards (0: tune for the host)
+    'download_connections': 1,
+    'min_segment_size': 1024 * 1024,
+    'cache_max_mb': 2048,
+    # Pinned SHA-256 of downloaded archives by URL (pin tag or commit URLs,
+    # a branch archive changes with every push); --archive-manifest adds more
+    'archive_sha256': {},
+    # Materialize node_modules from a hardlinked store shared by every install
+    'shared_store': False,
+    # Tool caches inside node_modules are written in place, so never shared
+    'store_exclude_dirs': ['.cache', '.vite'],
+    # Least recently used trees are evicted past this size
+    'store_max_mb': 4096,
+    'bundle_format': 1,
+    'build_output_dirs': ['dist'],
+    # Launchers serve the prebuilt output ('vite preview' or a static server)
+    # and fall back to the dev server, whose caches are primed at install time
+    'launcher_version': 2,
+    'preview_port': 4173,
+    'dev_port': 5173,
+    'launcher_ready_timeout': 120,
+    'prime_dev_server': True,
+    'warmup_timeout_seconds': 180,
+    'bundle_exclude_dirs': ['node_modules', '.git'],
+    # Local state moved from a repository's old tree into its updated one
+    'preserve_on_update': ['node_modules', '.env'],
+    'output_tail_kb': 64,
+    'stall_warning_seconds': 120,
+    'stall_timeout_seconds': 1800,
+    'log_format': 'text',
+    'log_flush_interval': 1.0,
+    'log_buffer_size': 64 * 1024,
+    'log_ring_size': 2000,
+    # Relative cost of each installation task in the overall progress bar
+    'progress_weights': {
+        'requirements': 2, 'directories': 1, 'download': 25, 'extract': 8,
+        'dependencies': 40, 'build': 15, 'warmup': 5, 'environment': 1, 'launchers': 1
+    },
+    'progress_min_interval': 0.1,
+    'progress_min_delta': 0.5,
+    'gui_poll_interval_ms': 50,
+    'gui_max_events_per_poll': 500
 }
 
+class InstallCancelled(Exception):
+    """Raised inside the installer once the user has cancelled"""
+
+class CommandStalled(subprocess.SubprocessError):
+    """Raised when a child process produces no output for too long"""
+
+class IntegrityError(Exception):
+    """Raised when downloaded content does not match its pinned SHA-256"""
+
+class RangesIgnored(IOError):
+    """Raised when a server answers a byte-range request with the whole file"""
+
+class OutputTail:
+    """The last max_bytes worth of lines from a child process"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.lines = collections.deque()
+        self.size = 0
+    
+    def append(self, line: str):
+        self.lines.append(line)
+        self.size += len(line) + 1
+        while self.size > self.max_bytes and len(self.lines) > 1:
+            self.size -= len(self.lines.popleft()) + 1
+    
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+def host_cpu_count() -> int:
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+def host_memory() -> Tuple[Optional[int], Optional[int]]:
+    """Total and available physical memory in bytes, where the OS reports them"""
+    try:
+        if sys.platform.startswith('linux'):
+            info = {}
+            with open('/proc/meminfo', encoding='ascii') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    info[key] = int(value.split()[0]) * 1024
+            return info.get('MemTotal'), info.get('MemAvailable', info.get('MemFree'))
+        if os.name == 'nt':
+            import ctypes
+            
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                            ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                            ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                            ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                            ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+            
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullTotalPhys, status.ullAvailPhys
+            return None, None
+        total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        # macOS has no count of available pages; leave it unknown there
+        try:
+            available = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+        except (ValueError, OSError):
+            available = None
+        return total, available
+    except (OSError, ValueError, AttributeError):
+        return None, None
+
+def disk_write_throughput(directory: Path, size: int) -> Optional[float]:
+    """Measure synced sequential write speed in bytes per second"""
+    probe = directory / f".anarqq-disk-probe-{os.getpid()}"
+    chunk = b'\0' * (1024 * 1024)
+    try:
+        started = time.perf_counter()
+        with open(probe, 'wb') as f:
+            for _ in range(max(1, size // len(chunk))):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        elapsed = time.perf_counter() - started
+        return max(1, size // len(chunk)) * len(chunk) / max(elapsed, 1e-6)
+    except OSError:
+        return None
+    finally:
+        try:
+            probe.unlink()
+        except OSError:
+            pass
+
+def terminate_process_tree(process: subprocess.Popen):
+    """Terminate a child process together with everything it spawned"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                           capture_output=True)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+    except OSError:
+        process.kill()
+
+def http_ready(url: str) -> bool:
+    """Whether a server answers HTTP at url (any status counts as up)"""
+    try:
+        with urllib.request.urlopen(url, timeout=2):
+            return True
+    except urllib.error.HTTPError:
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+def free_port() -> int:
+    """A localhost TCP port nothing is listening on right now"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def archive_member_path(target: Path, name: str, strip_components: int = 0) -> Optional[Path]:
+    """Map an archive member name to a path below target, or None to skip it"""
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.')]
+    if '..' in parts or name.startswith('/') or (parts and ':' in parts[0]):
+        raise zipfile.BadZipFile(f"Unsafe path in archive: {name}")
+    parts = parts[strip_components:]
+    return target.joinpath(*parts) if parts else None
+
+class InstallProfile:
+    """Include/exclude path patterns selecting which files of a repository to install
+    
+    Patterns follow git's non-cone sparse-checkout syntax, so one profile
+    drives both sparse checkouts and filtered ZIP extraction.
+    """
+    
+    def __init__(self, name: str, include: Iterable[str], exclude: Iterable[str] = ()):
+        self.name = name
+        self.patterns = list(include) + [f"!{pattern}" for pattern in exclude]
+    
+    @property
+    def full(self) -> bool:
+        return self.patterns == ['/*']
+    
+    def selects(self, path: str, is_dir: bool = False) -> bool:
+        """Whether a repository-relative path is installed (the last matching pattern wins)"""
+        parts = path.strip('/').split('/')
+        candidates = [('/'.join(parts[:depth]), True) for depth in range(1, len(parts))]
+        candidates.append(('/'.join(parts), is_dir))
+        selected = False
+        for pattern in self.patterns:
+            negated = pattern.startswith('!')
+            body = pattern[1:] if negated else pattern
+            if any(self.matches(body, candidate, candidate_is_dir)
+                   for candidate, candidate_is_dir in candidates):
+                selected = not negated
+        return selected
+    
+    @staticmethod
+    def matches(pattern: str, path: str, is_dir: bool) -> bool:
+        if pattern.endswith('/'):
+            if not is_dir:
+                return False
+            pattern = pattern.rstrip('/')
+        if '/' not in pattern.lstrip('/') and not pattern.startswith('/'):
+            # Unanchored: matches a name at any depth
+            return fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], pattern)
+        pattern_parts = pattern.lstrip('/').split('/')
+        path_parts = path.split('/')
+        return (len(pattern_parts) == len(path_parts) and
+                all(fnmatch.fnmatchcase(part, wanted) for part, wanted in zip(path_parts, pattern_parts)))
+
+def extract_zip_members(zip_path: str, members: list) -> int:
+    """Extract (member name, target path, mode) entries; runs in a worker process"""
+    written = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        for name, path, mode in members:
+            with archive.open(name) as source, open(path, 'wb') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+                written += target.tell()
+            if os.name != 'nt' and mode & 0o111:
+                os.chmod(path, mode & 0o777)
+    return written
+
+def partition_members(members: list, sizes: list, count: int) -> list:
+    """Split members into count batches of similar total size (largest first)"""
+    batches = [[] for _ in range(count)]
+    loads = [0] * count
+    for member, size in sorted(zip(members, sizes), key=lambda item: -item[1]):
+        lightest = loads.index(min(loads))
+        batches[lightest].append(member)
+        loads[lightest] += size
+    return [batch for batch in batches if batch]
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of the regular files below path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            try:
+                total += os.lstat(os.path.join(root, file_name)).st_size
+            except OSError:
+                pass
+    return total
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def copy_and_hash(source, target: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Copy a readable stream into target, returning the SHA-256 of the bytes written"""
+    digest = hashlib.sha256()
+    with open(target, 'wb') as f:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+class StreamingZipExtractor:
+    """Extract a ZIP archive from a byte stream as the bytes arrive
+    
+    Every entry's CRC-32 is computed as it is inflated and checked against
+    its local header (or data descriptor), so corruption surfaces as
+    zipfile.BadZipFile without reading anything twice.
+    """
+    LOCAL_HEADER = b'PK\x03\x04'
+    DATA_DESCRIPTOR = b'PK\x07\x08'
+    LOCAL_HEADER_STRUCT = struct.Struct('<4sHHHHHIIIHH')
+    CENTRAL_HEADER_STRUCT = struct.Struct('<4s4B4HL2L5H2L')
+    
+    def __init__(self, target: Path, strip_components: int = 1,
+                 profile: Optional[InstallProfile] = None):
+        self.target = target
+        self.strip_components = strip_components
+        self.profile = profile
+        self.reset()
+    
+    def reset(self):
+        """Discard everything extracted so far and start from byte zero"""
+        if self.target.exists():
+            shutil.rmtree(self.target)
+        self.target.mkdir(parents=True)
+        self.position = 0
+        self.buffer = bytearray()
+        self.central_directory = bytearray()
+        self.entry = None
+        self.output = None
+        self.finished = False
+        self.unsupported = None
+        self.files_written = 0
+        self.files_skipped = 0
+        self.bytes_written = 0
+    
+    def tell(self) -> int:
+        """Number of archive bytes consumed so far"""
+        return self.position
+    
+    def feed(self, data: bytes):
+        """Consume the next chunk of the archive"""
+        self.position += len(data)
+        if self.unsupported:
+            return
+        if self.finished:
+            self.central_directory += data
+            return
+        self.buffer += data
+        while self.step():
+            pass
+    
+    def close(self):
+        """Finish extraction once the whole archive has been fed"""
+        if self.unsupported:
+            return
+        if not self.finished:
+            if self.output:
+                self.output.close()
+                self.output = None
+            raise zipfile.BadZipFile("Archive ended in the middle of an entry")
+        self.apply_permissions()
+    
+    def entry_path(self, name: str) -> Optional[Path]:
+        """Map an archive member name to a path below the target, or None to skip it"""
+        path = archive_member_path(self.target, name, self.strip_components)
+        if path is not None and self.profile is not None and \
+                not self.profile.selects(path.relative_to(self.target).as_posix(), name.endswith('/')):
+            return None
+        return path
+    
+    def step(self) -> bool:
+        """Advance the parser; returns False when more input is needed"""
+        if self.entry is None:
+            return self.read_header()
+        if self.entry['state'] == 'data':
+            return self.read_data()
+        return self.read_descriptor()
+    
+    def read_header(self) -> bool:
+        if len(self.buffer) < 4:
+            return False
+        if self.buffer[:4] != self.LOCAL_HEADER:
+            if self.buffer[:2] != b'PK':
+                raise zipfile.BadZipFile("Unexpected data between archive entries")
+            # Central directory reached: every entry has been extracted
+            self.finished = True
+            self.central_directory += self.buffer
+            self.buffer = bytearray()
+            return False
+        if len(self.buffer) < self.LOCAL_HEADER_STRUCT.size:
+            return False
+        (_, _, flags, method, _, _, crc, compressed_size, size,
+         name_length, extra_length) = self.LOCAL_HEADER_STRUCT.unpack_from(self.buffer)
+        header_size = self.LOCAL_HEADER_STRUCT.size + name_length + extra_length
+        if len(self.buffer) < header_size:
+            return False
+        
+        raw_name = bytes(self.buffer[self.LOCAL_HEADER_STRUCT.size:
+                                     self.LOCAL_HEADER_STRUCT.size + name_length])
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+        extra = bytes(self.buffer[self.LOCAL_HEADER_STRUCT.size + name_length:header_size])
+        del self.buffer[:header_size]
+        
+        zip64 = (compressed_size == 0xFFFFFFFF or size == 0xFFFFFFFF or
+                 self.has_extra_field(extra, 0x0001))
+        if zip64:
+            compressed_size = self.zip64_compressed_size(extra, size, compressed_size)
+        
+        if flags & 0x1 or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or \
+                (method == zipfile.ZIP_STORED and flags & 0x8):
+            # Encrypted, exotic or unbounded stored entries cannot be streamed
+            self.unsupported = name
+            self.buffer = bytearray()
+            return False
+        
+        path = self.entry_path(name)
+        self.entry = {'name': name, 'flags': flags, 'method': method, 'zip64': zip64,
+                      'remaining': compressed_size, 'state': 'data', 'crc': crc, 'computed_crc': 0,
+                      'decompressor': zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None}
+        if path is None or name.endswith('/'):
+            if path is not None:
+                path.mkdir(parents=True, exist_ok=True)
+            elif not name.endswith('/'):
+                self.files_skipped += 1
+            self.output = None
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.output = open(path, 'wb')
+            self.files_written += 1
+        return True
+    
+    def has_extra_field(self, extra: bytes, wanted: int) -> bool:
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, data_size = struct.unpack_from('<HH', extra, offset)
+            if header_id == wanted:
+                return True
+            offset += 4 + data_size
+        return False
+    
+    def zip64_compressed_size(self, extra: bytes, size: int, compressed_size: int) -> int:
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, data_size = struct.unpack_from('<HH', extra, offset)
+            if header_id == 0x0001:
+                values = extra[offset + 4:offset + 4 + data_size]
+                index = 8 if size == 0xFFFFFFFF else 0
+                if compressed_size == 0xFFFFFFFF and len(values) >= index + 8:
+                    return struct.unpack_from('<Q', values, index)[0]
+                return compressed_size
+            offset += 4 + data_size
+        return compressed_size
+    
+    def write(self, data: bytes):
+        if not data:
+            return
+        self.entry['computed_crc'] = zlib.crc32(data, self.entry['computed_crc'])
+        if self.output:
+            self.output.write(data)
+            self.bytes_written += len(data)
+    
+    def check_crc(self, expected: int):
+        if self.entry['computed_crc'] != expected:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for {self.entry['name']} "
+                                     f"(expected {expected:08x}, got {self.entry['computed_crc']:08x})")
+    
+    def read_data(self) -> bool:
+        entry = self.entry
+        if not self.buffer and not (entry['method'] == zipfile.ZIP_STORED and entry['remaining'] == 0):
+            return False
+        
+        if entry['method'] == zipfile.ZIP_STORED:
+            take = min(entry['remaining'], len(self.buffer))
+            self.write(bytes(self.buffer[:take]))
+            del self.buffer[:take]
+            entry['remaining'] -= take
+            done = entry['remaining'] == 0
+        else:
+            decompressor = entry['decompressor']
+            data = bytes(self.buffer)
+            self.buffer = bytearray()
+            while data and not decompressor.eof:
+                self.write(decompressor.decompress(data, 1024 * 1024))
+                data = decompressor.unconsumed_tail
+            if decompressor.eof:
+                self.buffer = bytearray(decompressor.unused_data)
+            done = decompressor.eof
+        
+        if not done:
+            return False
+        if self.output:
+            self.output.close()
+            self.output = None
+        if entry['flags'] & 0x8:
+            entry['state'] = 'descriptor'
+        else:
+            self.check_crc(entry['crc'])
+            self.entry = None
+        return True
+    
+    def read_descriptor(self) -> bool:
+        size_length = 8 if self.entry['zip64'] else 4
+        length = 4 + 2 * size_length
+        if len(self.buffer) < 4:
+            return False
+        crc_offset = 0
+        if self.buffer[:4] == self.DATA_DESCRIPTOR:
+            length += 4
+            crc_offset = 4
+        if len(self.buffer) < length:
+            return False
+        self.check_crc(struct.unpack_from('<I', self.buffer, crc_offset)[0])
+        del self.buffer[:length]
+        self.entry = None
+        return True
+    
+    def apply_permissions(self):
+        """Restore Unix permission bits recorded in the central directory"""
+        if os.name == 'nt':
+            return
+        data = self.central_directory
+        offset = 0
+        size = self.CENTRAL_HEADER_STRUCT.size
+        while data[offset:offset + 4] == b'PK\x01\x02' and offset + size <= len(data):
+            fields = self.CENTRAL_HEADER_STRUCT.unpack_from(data, offset)
+            create_system, name_length, extra_length, comment_length = \
+                fields[2], fields[12], fields[13], fields[14]
+            external_attributes = fields[17]
+            raw_name = bytes(data[offset + size:offset + size + name_length])
+            offset += size + name_length + extra_length + comment_length
+            
+            mode = external_attributes >> 16
+            if create_system != 3 or not mode & 0o111 or raw_name.endswith(b'/'):
+                continue
+            name = raw_name.decode('utf-8' if fields[5] & 0x800 else 'cp437')
+            path = self.entry_path(name)
+            if path is not None and path.is_file():
+                path.chmod(mode & 0o777)
+
+class HttpResponse:
+    """A response from HttpClient; closing it returns the connection to the pool"""
+    
+    def __init__(self, client: 'HttpClient', key: tuple, connection, response, url: str):
+        self.client = client
+        self.key = key
+        self.connection = connection
+        self.response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *_):
+        self.close()
+    
+    def read(self, size: int = -1) -> bytes:
+        return self.response.read(size if size >= 0 else None)
+    
+    def geturl(self) -> str:
+        return self.url
+    
+    def close(self):
+        if self.connection is None:
+            return
+        response = self.response
+        if response.length == 0 and not response.isclosed():
+            # Bodyless (HEAD, 304) or fully read: nothing left on the wire
+            response.read()
+        # Only a response read to its end leaves the connection usable
+        reusable = not response.will_close and response.isclosed() and \
+            (response.length == 0 or response.chunked)
+        self.client.release(self.key, self.connection, reusable)
+        self.connection = None
+
+class HttpClient:
+    """Keep-alive HTTP(S) connections shared by every download of an installation
+    
+    Connections are pooled per scheme, host and port, so the HEAD preflight,
+    the byte ranges and the demo and core archives from one host reuse them
+    instead of paying a TCP and TLS handshake each. retry_delay() is the
+    retry policy: jittered exponential backoff for transient failures, and
+    only for idempotent methods unless the request never left.
+    """
+    IDEMPOTENT = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+    RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+    REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+    
+    def __init__(self, timeout: float, pool_size: int):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.idle: Dict[tuple, list] = {}
+        self.lock = threading.Lock()
+        self.proxies = urllib.request.getproxies()
+        self.context = None
+        self.connections_opened = 0
+    
+    def proxy_for(self, scheme: str, host: str):
+        """The environment's proxy for a URL (as urlopen would use it), or None"""
+        proxy = self.proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return urllib.parse.urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+    
+    @staticmethod
+    def proxy_headers(proxy) -> Dict[str, str]:
+        """Proxy-Authorization for credentials given in the proxy URL, as urlopen sends it"""
+        if proxy.username is None:
+            return {}
+        credentials = (f"{urllib.parse.unquote(proxy.username)}:"
+                       f"{urllib.parse.unquote(proxy.password or '')}")
+        return {'Proxy-Authorization': f"Basic {base64.b64encode(credentials.encode()).decode('ascii')}"}
+    
+    def connect(self, scheme: str, host: str, port: int):
+        """Open a new connection, through the proxy if there is one"""
+        proxy = self.proxy_for(scheme, host)
+        with self.lock:
+            self.connections_opened += 1
+        if proxy:
+            proxy_port = proxy.port or (443 if proxy.scheme == 'https' else 80)
+        if scheme == 'https':
+            if self.context is None:
+                self.context = ssl.create_default_context()
+            if proxy:
+                connection = http.client.HTTPSConnection(proxy.hostname, proxy_port,
+                                                         timeout=self.timeout, context=self.context)
+                connection.set_tunnel(host, port, headers=self.proxy_headers(proxy))
+                return connection
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self.context)
+        if proxy:
+            return http.client.HTTPConnection(proxy.hostname, proxy_port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+    
+    def acquire(self, key: tuple):
+        """An idle pooled connection for key, or None"""
+        with self.lock:
+            connections = self.idle.get(key)
+            return connections.pop() if connections else None
+    
+    def release(self, key: tuple, connection, reusable: bool):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if reusable and len(connections) < self.pool_size:
+                connections.append(connection)
+                return
+        connection.close()
+    
+    def open(self, method: str, url: str, headers: Optional[dict] = None,
+             max_redirects: int = 5) -> HttpResponse:
+        """Send one request, following redirects
+        
+        Like urlopen, statuses of 300 and above that are not followed raise
+        urllib.error.HTTPError. A pooled connection the server has meanwhile
+        closed is replaced transparently for idempotent methods.
+        """
+        headers = dict(headers or {})
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            if parts.scheme not in ('http', 'https'):
+                raise urllib.error.URLError(f"Unsupported URL scheme: {url}")
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            key = (parts.scheme, parts.hostname, port)
+            # Plain HTTP proxies take the absolute URL as the request target,
+            # and their credentials on every request
+            proxy = self.proxy_for(parts.scheme, parts.hostname)
+            request_headers = headers
+            if parts.scheme == 'http' and proxy:
+                target = url
+                request_headers = dict(headers, **self.proxy_headers(proxy))
+            else:
+                target = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+            
+            while True:
+                connection = self.acquire(key)
+                reused = connection is not None
+                if connection is None:
+                    connection = self.connect(parts.scheme, parts.hostname, port)
+                try:
+                    connection.request(method, target, headers=request_headers)
+                    response = connection.getresponse()
+                    break
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    if reused and method in self.IDEMPOTENT:
+                        continue
+                    raise
+            
+            result = HttpResponse(self, key, connection, response, url)
+            location = response.headers.get('Location')
+            if response.status in self.REDIRECT_STATUSES and location:
+                self.discard_body(result)
+                url = urllib.parse.urljoin(url, location)
+                if response.status == 303 and method != 'HEAD':
+                    method = 'GET'
+                continue
+            if response.status >= 300:
+                self.discard_body(result)
+                raise urllib.error.HTTPError(url, response.status, response.reason,
+                                             response.headers, None)
+            return result
+        raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, None)
+    
+    def discard_body(self, response: HttpResponse):
+        """Drain a small unwanted body so the connection stays reusable"""
+        length = response.response.length
+        if length is not None and length <= 64 * 1024:
+            try:
+                response.read()
+            except (http.client.HTTPException, OSError):
+                pass
+        response.close()
+    
+    def request(self, method: str, url: str, headers: Optional[dict] = None,
+                cancel_event: Optional[threading.Event] = None) -> HttpResponse:
+        """open() with retries, for requests whose body is read in one go"""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self.open(method, url, headers)
+            except (http.client.HTTPException, OSError) as e:
+                delay = self.retry_delay(method, attempt, e)
+                if delay is None:
+                    raise
+                if cancel_event is None:
+                    time.sleep(delay)
+                elif cancel_event.wait(delay):
+                    raise
+    
+    def retry_delay(self, method: str, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying a failed request, or None to give up"""
+        if attempt >= CONFIG['download_retries']:
+            return None
+        if isinstance(error, urllib.error.HTTPError):
+            if error.code not in self.RETRY_STATUSES:
+                return None
+            retry_after = (error.headers or {}).get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), CONFIG['http_backoff_max'])
+        elif not isinstance(error, (http.client.HTTPException, OSError)):
+            return None
+        # A refused connection never reached the server, so any method may retry
+        if method not in self.IDEMPOTENT and not isinstance(error, ConnectionRefusedError):
+            return None
+        # Jitter keeps a lab of installers from retrying in lockstep
+        ceiling = min(CONFIG['http_backoff_max'], CONFIG['http_backoff_base'] * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+    
+    def close(self):
+        """Close every idle connection"""
+        with self.lock:
+            connections = [c for pool in self.idle.values() for c in pool]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+class FileLock:
+    """Exclusive advisory lock on a file, honoured by every installer process
+    
+    Works across machines where the filesystem supports it (NFS and SMB
+    shares do); the lock is released when the holder exits, even if it crashes.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.handle = None
+    
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock, or with blocking=False return False if it is held"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self.path, 'a+b')
+        try:
+            if os.name == 'nt':
+                while True:
+                    try:
+                        handle.seek(0)
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+                        time.sleep(0.05)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            handle.close()
+            if blocking:
+                raise
+            return False
+        self.handle = handle
+        return True
+    
+    def release(self):
+        if self.handle is None:
+            return
+        try:
+            if os.name == 'nt':
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.handle.close()
+            self.handle = None
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc):
+        self.release()
+
+class ArchiveCache:
+    """Content-addressed store of downloaded archives with HTTP validators
+    
+    index.json maps each URL to the SHA-256 of its last archive plus the
+    ETag/Last-Modified the server sent with it; archives themselves live in
+    objects/<sha256>.zip so identical content is stored once. Updates to the
+    index hold index.lock, so installers sharing the cache never lose
+    each other's entries.
+    """
+    
+    lock = threading.Lock()
+    
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.objects_dir = root / 'objects'
+        self.index_file = root / 'index.json'
+        self.max_bytes = max_bytes
+    
+    def load_index(self) -> dict:
+        try:
+            return json.loads(self.index_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+    
+    def locked(self) -> FileLock:
+        """Lock held while reading, changing and writing back the index"""
+        return FileLock(self.root / 'index.lock')
+    
+    def save_index(self, index: dict):
+        # Write-then-rename so concurrent installers never see a torn index
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_file = self.index_file.with_name(
+            f"index.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_file.write_text(json.dumps(index, indent=2), encoding='utf-8')
+        os.replace(temp_file, self.index_file)
+    
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / f"{digest}.zip"
+    
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return the cache entry for a URL if its archive is still present"""
+        with self.lock:
+            entry = self.load_index().get(url)
+        if entry and self.object_path(entry['sha256']).exists():
+            return entry
+        return None
+    
+    def validators(self, entry: dict) -> dict:
+        """Conditional request headers for revalidating a cache entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def touch(self, url: str) -> Path:
+        """Mark a URL's archive as recently used and return its path"""
+        with self.lock, self.locked():
+            index = self.load_index()
+            index[url]['last_used'] = time.time()
+            self.save_index(index)
+            return self.object_path(index[url]['sha256'])
+    
+    def store(self, url: str, archive: Path, validators: dict, digest: Optional[str] = None) -> Path:
+        """Move a freshly downloaded archive into the cache
+        
+        digest is the archive's SHA-256 when the caller hashed it while
+        writing; only otherwise is the file read again to compute it.
+        """
+        digest = digest or file_sha256(archive)
+        target = self.object_path(digest)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(archive, target)
+        with self.lock, self.locked():
+            index = self.load_index()
+            index[url] = {'sha256': digest, 'size': target.stat().st_size,
+                          'etag': validators.get('etag'),
+                          'last_modified': validators.get('last_modified'),
+                          'last_used': time.time()}
+            self.trim(index, keep=digest)
+            self.save_index(index)
+        return target
+    
+    def trim(self, index: dict, keep: str):
+        """Evict least recently used archives until the cache fits its budget"""
+        sizes = {entry['sha256']: entry['size'] for entry in index.values()}
+        total = sum(sizes.values())
+        for url, entry in sorted(index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if entry['sha256'] == keep:
+                continue
+            del index[url]
+            # Objects may be shared by several URLs
+            if all(other['sha256'] != entry['sha256'] for other in index.values()):
+                total -= sizes[entry['sha256']]
+                path = self.object_path(entry['sha256'])
+                if path.exists():
+                    path.unlink()
+
+class PackageStore:
+    """Content-addressed store of installed node_modules trees
+    
+    Every file lives once under objects/<sha256[:2]>/<sha256>; trees/<key>.json
+    lists the files, modes and symlinks of a node_modules tree keyed by its
+    lockfile, Node version and platform. Trees are materialized with
+    hardlinks, falling back to copies across filesystems. Objects are made
+    read-only so a tool writing into a linked file fails instead of
+    corrupting every other installation.
+    
+    A tree file's mtime records when it was last used. Installers take
+    store.lock while reading or changing the store, so trim() never deletes
+    objects another installer is linking or adding.
+    """
+    
+    lock = threading.Lock()
+    
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.objects_dir = root / 'objects'
+        self.trees_dir = root / 'trees'
+        self.max_bytes = max_bytes
+    
+    def locked(self) -> FileLock:
+        """Lock held while looking up, materializing, adding or trimming trees"""
+        return FileLock(self.root / 'store.lock')
+    
+    @staticmethod
+    def tree_key(lock_hash: str, node_version: str) -> str:
+        identity = json.dumps([lock_hash, node_version, sys.platform, platform.machine()])
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+    
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+    
+    def tree_path(self, key: str) -> Path:
+        return self.trees_dir / f"{key}.json"
+    
+    def lookup(self, key: str) -> Optional[list]:
+        """File list of a stored tree, if it and all its objects are present"""
+        try:
+            entries = json.loads(self.tree_path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if all('link' in entry or self.object_path(entry['sha256']).exists() for entry in entries):
+            return entries
+        return None
+    
+    def touch(self, key: str):
+        """Mark a tree as recently used"""
+        try:
+            os.utime(self.tree_path(key))
+        except OSError:
+            pass
+    
+    def ingest(self, key: str, source: Path, exclude: Iterable[str] = ()) -> Tuple[int, int]:
+        """Add a tree to the store, replacing its files with links to the objects
+        
+        Returns the number of files and how many were new to the store.
+        """
+        exclude = set(exclude)
+        entries = []
+        added = 0
+        for root, dirs, files in os.walk(source):
+            dirs[:] = [d for d in dirs if d not in exclude]
+            root_path = Path(root)
+            for name in list(dirs) + files:
+                path = root_path / name
+                relative = path.relative_to(source).as_posix()
+                if path.is_symlink():
+                    entries.append({'path': relative, 'link': os.readlink(path)})
+                    if name in dirs:
+                        dirs.remove(name)
+                    continue
+                if name in dirs:
+                    continue
+                digest = file_sha256(path)
+                mode = path.stat().st_mode & 0o777
+                entries.append({'path': relative, 'sha256': digest, 'mode': mode})
+                target = self.object_path(digest)
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    temp_file = target.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+                    shutil.copy2(path, temp_file)
+                    if os.name != 'nt':
+                        temp_file.chmod(mode & ~0o222)
+                    os.replace(temp_file, target)
+                    added += 1
+                self.link_or_copy(target, path, mode)
+        
+        self.trees_dir.mkdir(parents=True, exist_ok=True)
+        tree_file = self.tree_path(key)
+        temp_file = tree_file.with_name(f"{key}.{os.getpid()}.tmp")
+        temp_file.write_text(json.dumps(entries), encoding='utf-8')
+        os.replace(temp_file, tree_file)
+        return len(entries), added
+    
+    def trim(self, keep: str) -> Tuple[int, int]:
+        """Evict least recently used trees until the store fits its budget
+        
+        Objects no remaining tree lists are deleted, including those left by
+        an interrupted ingest. Installations linked to them keep their files:
+        only the store's link goes. Returns the trees and bytes removed.
+        """
+        trees = {}
+        for tree_file in self.trees_dir.glob('*.json'):
+            try:
+                trees[tree_file.stem] = (tree_file.stat().st_mtime, {
+                    entry['sha256'] for entry in json.loads(tree_file.read_text(encoding='utf-8'))
+                    if 'sha256' in entry})
+            except (OSError, ValueError):
+                continue
+        # Objects are named by bare digest; anything else is a temporary file
+        sizes = {path.name: path.stat().st_size for path in self.objects_dir.glob('*/*')
+                 if '.' not in path.name}
+        users = collections.Counter(digest for _, digests in trees.values() for digest in digests)
+        total = sum(sizes.values())
+        
+        evicted = 0
+        for key in sorted(trees, key=lambda key: trees[key][0]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.tree_path(key).unlink()
+            evicted += 1
+            for digest in trees.pop(key)[1]:
+                users[digest] -= 1
+                if not users[digest]:
+                    total -= sizes.get(digest, 0)
+        
+        freed = 0
+        for digest, size in sizes.items():
+            if not users[digest]:
+                self.object_path(digest).unlink()
+                freed += size
+        return evicted, freed
+    
+    def materialize(self, entries: list, target: Path) -> Tuple[int, int]:
+        """Recreate a stored tree at target; returns (hardlinked, copied) file counts"""
+        for directory in {(target / entry['path']).parent for entry in entries}:
+            directory.mkdir(parents=True, exist_ok=True)
+        linked = copied = 0
+        for entry in entries:
+            path = target / entry['path']
+            if 'link' in entry:
+                os.symlink(entry['link'], path)
+            elif self.link_or_copy(self.object_path(entry['sha256']), path, entry['mode']):
+                linked += 1
+            else:
+                copied += 1
+        return linked, copied
+    
+    def link_or_copy(self, source: Path, path: Path, mode: int) -> bool:
+        """Point path at a store object, by hardlink if possible; True if linked"""
+        temp_file = path.with_name(f".{path.name}.{os.getpid()}.link")
+        try:
+            os.link(source, temp_file)
+            linked = True
+        except OSError:
+            # Different filesystem, or links unsupported: a private writable copy
+            shutil.copyfile(source, temp_file)
+            if os.name != 'nt':
+                temp_file.chmod(mode)
+            linked = False
+        os.replace(temp_file, path)
+        return linked
+
+class InstallLogger:
+    """Buffered log writer with an in-memory ring of recent entries
+    
+    The log file stays open for the whole run and is flushed periodically
+    (and on warnings/errors) instead of being reopened for every message.
+    Entries are plain "[LEVEL] message" lines or, with the jsonl format, one
+    JSON object per line carrying a monotonic timestamp and the step ID.
+    """
+    
+    def __init__(self, log_format: str = 'text'):
+        self.log_format = log_format
+        self.lock = threading.Lock()
+        self.handle = None
+        self.path = None
+        self.started = time.monotonic()
+        self.last_flush = self.started
+        self.ring = collections.deque(maxlen=CONFIG['log_ring_size'])
+        self.sequence = 0
+        self.stop_event = threading.Event()
+        self.flusher = None
+    
+    def write(self, level: str, message: str, step: Optional[str], path: Path) -> str:
+        """Record an entry and return its human-readable form"""
+        entry = f"[{level}] {message}"
+        now = time.monotonic()
+        with self.lock:
+            self.sequence += 1
+            self.ring.append((self.sequence, entry))
+            
+            if self.path != path:
+                self.open(path)
+            if self.handle is None:
+                return entry
+            
+            if self.log_format == 'jsonl':
+                record = {'t': round(now - self.started, 6), 'time': time.time(),
+                          'level': level, 'step': step, 'message': message}
+                self.handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                self.handle.write(entry + "\n")
+            
+            if level in ('WARNING', 'ERROR') or now - self.last_flush >= CONFIG['log_flush_interval']:
+                self.handle.flush()
+                self.last_flush = now
+        return entry
+    
+    def open(self, path: Path):
+        """Switch to a new log file (called with the lock held)"""
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+        self.path = None
+        if not path.parent.exists():
+            return
+        self.handle = open(path, 'a', encoding='utf-8', buffering=CONFIG['log_buffer_size'])
+        self.path = path
+        if self.flusher is None:
+            self.flusher = threading.Thread(target=self.flush_periodically, daemon=True)
+            self.flusher.start()
+    
+    def flush_periodically(self):
+        while not self.stop_event.wait(CONFIG['log_flush_interval']):
+            self.flush()
+    
+    def flush(self):
+        with self.lock:
+            if self.handle is not None:
+                self.handle.flush()
+                self.last_flush = time.monotonic()
+    
+    def close(self):
+        self.stop_event.set()
+        with self.lock:
+            if self.handle is not None:
+                self.handle.close()
+                self.handle = None
+            self.path = None
+    
+    def entries_since(self, sequence: int) -> Tuple[int, list]:
+        """Entries newer than sequence (older ones may have left the ring)"""
+        with self.lock:
+            entries = [entry for number, entry in self.ring if number > sequence]
+            return self.sequence, entries
+
+class InstallMetrics:
+    """Wall time, CPU and I/O figures for each installation phase
+    
+    A phase is a step ID set with AnarQQInstaller.set_step. CPU time is the
+    installer process's own, so phases running concurrently on different
+    threads share it; child figures come from each git/npm process's
+    resource usage when it exits and are attributed to the phase that ran it.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.started = time.perf_counter()
+            self.phases: Dict[str, dict] = {}
+            self.open_phases: Dict[int, tuple] = {}
+    
+    def snapshot(self) -> Tuple[float, float]:
+        times = os.times()
+        return time.perf_counter(), times.user + times.system
+    
+    def phase(self, name: str) -> dict:
+        """Counters for a phase (called with the lock held)"""
+        if name not in self.phases:
+            self.phases[name] = {'started': round(time.perf_counter() - self.started, 3),
+                                 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                 'child_cpu_seconds': 0.0, 'peak_child_rss_mb': 0.0,
+                                 'bytes_downloaded': 0, 'bytes_written': 0, 'commands': 0,
+                                 'skipped': False}
+        return self.phases[name]
+    
+    def enter(self, name: Optional[str]):
+        """End the calling thread's current phase and start the named one"""
+        thread = threading.get_ident()
+        wall, cpu = self.snapshot()
+        with self.lock:
+            current = self.open_phases.pop(thread, None)
+            if current:
+                self.close_phase(current, wall, cpu)
+            if name:
+                self.phase(name)
+                self.open_phases[thread] = (name, wall, cpu)
+    
+    def close_phase(self, current: tuple, wall: float, cpu: float):
+        name, started_wall, started_cpu = current
+        phase = self.phase(name)
+        phase['wall_seconds'] += wall - started_wall
+        phase['cpu_seconds'] += cpu - started_cpu
+    
+    def add(self, name: Optional[str], counter: str, amount: int):
+        if name and amount:
+            with self.lock:
+                self.phase(name)[counter] += amount
+    
+    def skip(self, name: Optional[str]):
+        """Mark a phase as having found its work already done"""
+        if name:
+            with self.lock:
+                self.phase(name)['skipped'] = True
+    
+    def record_child(self, name: Optional[str], usage):
+        """Account a finished child process's rusage to a phase"""
+        # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+        rss_mb = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+        with self.lock:
+            phase = self.phase(name or 'other')
+            phase['commands'] += 1
+            phase['child_cpu_seconds'] += usage.ru_utime + usage.ru_stime
+            phase['peak_child_rss_mb'] = max(phase['peak_child_rss_mb'], rss_mb)
+            # Block output is counted in 512-byte units when pages are dirtied
+            phase['bytes_written'] += usage.ru_oublock * 512
+    
+    def report(self) -> dict:
+        """Figures for every phase so far, closing any that are still open"""
+        wall, cpu = self.snapshot()
+        with self.lock:
+            for thread, current in list(self.open_phases.items()):
+                self.close_phase(current, wall, cpu)
+                self.open_phases[thread] = (current[0], wall, cpu)
+            phases = {}
+            for name, phase in self.phases.items():
+                phases[name] = dict(phase)
+                for key in ('wall_seconds', 'cpu_seconds', 'child_cpu_seconds', 'peak_child_rss_mb'):
+                    phases[name][key] = round(phase[key], 3)
+            return {'total_seconds': round(wall - self.started, 3), 'phases': phases}
+
+def format_bytes(size: float) -> str:
+    """Human-readable byte count"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+        size /= 1024
+
+class ProgressAggregator:
+    """Combine weighted task progress into one rate-limited overall percentage
+    
+    Tasks report fractions (or byte counts) as often as they like; the emit
+    callback only fires when the overall value moved by progress_min_delta
+    percent and progress_min_interval seconds have passed, or a task ends.
+    Byte-based tasks also get a smoothed throughput and ETA in their message;
+    those of unknown size only update their message, at most once per
+    interval.
+    """
+    
+    def __init__(self, emit):
+        self.emit = emit
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self, weights: Optional[Dict[str, float]] = None):
+        with self.lock:
+            self.weights = dict(weights or {})
+            self.fractions = {task: 0.0 for task in self.weights}
+            self.transfers = {}
+            self.last_emit = 0.0
+            self.last_percent = -100.0
+    
+    def total(self, task: str) -> int:
+        """Byte total last reported for a task (0 if unknown)"""
+        with self.lock:
+            return self.transfers.get(task, {}).get('total', 0)
+    
+    def overall(self) -> float:
+        total_weight = sum(self.weights.values())
+        if not total_weight:
+            return 0.0
+        done = sum(self.weights[task] * self.fractions[task] for task in self.weights)
+        return 100.0 * done / total_weight
+    
+    def update(self, task: str, fraction: Optional[float], message: str = "", force: bool = False):
+        """Report a task's completed fraction (None: only a new message)"""
+        now = time.monotonic()
+        with self.lock:
+            if task not in self.weights:
+                self.weights[task] = 1.0
+            if fraction is not None:
+                self.fractions[task] = max(0.0, min(1.0, fraction))
+            percent = self.overall()
+            moved = (fraction is None or
+                     abs(percent - self.last_percent) >= CONFIG['progress_min_delta'])
+            if not force and (now - self.last_emit < CONFIG['progress_min_interval'] or not moved):
+                return
+            self.last_emit = now
+            self.last_percent = percent
+        self.emit(int(percent), message)
+    
+    def update_bytes(self, task: str, done: int, total: int, label: str):
+        """Report byte progress, adding throughput and ETA to the message"""
+        now = time.monotonic()
+        with self.lock:
+            transfer = self.transfers.setdefault(task, {'time': now, 'done': done, 'rate': 0.0})
+            transfer['total'] = total
+            elapsed = now - transfer['time']
+            if elapsed >= 0.5:
+                sample = (done - transfer['done']) / elapsed
+                transfer['rate'] = sample if not transfer['rate'] else 0.3 * sample + 0.7 * transfer['rate']
+                transfer['time'], transfer['done'] = now, done
+            rate = transfer['rate']
+        
+        if total > 0:
+            percent = min(100, done * 100 // total)
+            message = f"{label}... {percent}%"
+            if rate > 0:
+                eta = max(0, total - done) / rate
+                message += f" ({format_bytes(rate)}/s, ETA {int(eta)}s)"
+            self.update(task, done / total, message, force=done >= total)
+        else:
+            message = f"{label}... {format_bytes(done)}"
+            if rate > 0:
+                message += f" ({format_bytes(rate)}/s)"
+            self.update(task, None, message)
+    
+    def complete(self, task: str, message: str = ""):
+        with self.lock:
+            if self.fractions.get(task) == 1.0:
+                return
+        self.update(task, 1.0, message, force=True)
+
+class ProgressSink:
+    """Forward archive bytes to a sink while reporting extraction progress"""
+    
+    def __init__(self, sink, report):
+        self.sink = sink
+        self.report = report
+    
+    def feed(self, data: bytes):
+        self.sink.feed(data)
+        self.report(self.sink.tell())
+    
+    def tell(self) -> int:
+        return self.sink.tell()
+    
+    def reset(self):
+        self.sink.reset()
+        self.report(0)
+
+class DigestSink:
+    """SHA-256 of archive bytes on their way to another sink (if any)"""
+    
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.digest = hashlib.sha256()
+        self.position = 0
+    
+    def feed(self, data: bytes):
+        self.digest.update(data)
+        self.position += len(data)
+        if self.sink is not None:
+            self.sink.feed(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def reset(self):
+        self.digest = hashlib.sha256()
+        self.position = 0
+        if self.sink is not None:
+            self.sink.reset()
+    
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+class InstallStep:
+    """A node of the installation graph
+    
+    The step runs once every step named in after has completed, holding a
+    slot of its resource budget ('io', 'cpu' or None for trivial steps).
+    tasks maps the progress tasks it reports to their default weights.
+    """
+    
+    def __init__(self, name: str, run, after: Iterable[str] = (), resource: Optional[str] = None,
+                 tasks: Optional[Dict[str, float]] = None, message: str = ""):
+        self.name = name
+        self.run = run
+        self.after = set(after)
+        self.resource = resource
+        self.tasks = tasks or {name: 1.0}
+        self.message = message
+
+class InstallState:
+    """Journal of the inputs each install step last completed with
+    
+    Steps forget their entry before they start changing anything and record
+    it only once they succeed, so a rerun skips every step whose inputs are
+    unchanged and resumes a failed run at the step that did not finish.
+    """
+    lock = threading.Lock()
+    
+    def __init__(self, path: Path):
+        self.path = path
+    
+    def load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+    
+    def get(self, section: str, key: str) -> Optional[dict]:
+        with self.lock:
+            return self.load().get(section, {}).get(key)
+    
+    def record(self, section: str, key: str, value: Optional[dict]):
+        """Store (or with None, forget) one entry and write the file atomically"""
+        with self.lock:
+            state = self.load()
+            entries = state.setdefault(section, {})
+            if value is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = value
+            temp_file = self.path.with_name(self.path.name + '.tmp')
+            temp_file.write_text(json.dumps(state, indent=2), encoding='utf-8')
+            os.replace(temp_file, self.path)
+
 class AnarQQInstaller:
     def __init__(self):
         self.install_dir = Path.home() / 'anarqq-ecosystem'
         self.demo_dir = self.install_dir / 'demo'
         self.core_dir = self.install_dir / 'core'
         self.log_file = self.install_dir / 'install.log'
+        self.cache_dir = Path(os.environ.get('ANARQQ_CACHE_DIR') or
+                              Path.home() / '.cache' / 'anarqq-installer')
+        self.download_connections = CONFIG['download_connections']
+        self.step_budget: Dict[str, int] = dict(CONFIG['step_budget'])
+        self.http = HttpClient(CONFIG['download_timeout'], CONFIG['http_pool_size'])
+        self.archive_pins: Dict[str, str] = dict(CONFIG['archive_sha256'])
+        self.install_profile = CONFIG['install_profile']
+        self.shared_store = CONFIG['shared_store']
+        self.tuning = self.tuning_profile(host_cpu_count(), None, None)
+        self.bundle: Optional[Path] = None
+        self.prebuilt = set()
+        # Trees replaced during this run, kept until it succeeds: destination -> update
+        self.swapped: Dict[Path, dict] = {}
         self.progress_callback = None
         self.log_callback = None
+        self.command_cache: Dict[str, Tuple[bool, str]] = {}
+        self.owner_thread = None
+        self.pending_events = queue.Queue()
+        self.logger = InstallLogger(CONFIG['log_format'])
+        self.echo = True
+        self.verbose = False
+        self.profile = False
+        self.step_context = threading.local()
+        self.metrics = InstallMetrics()
+        atexit.register(self.logger.close)
+        self.progress = ProgressAggregator(self.update_progress)
+        self.clone_stats: Dict[str, dict] = {}
+        self.cancel_event = threading.Event()
+        self.children = set()
+        self.children_lock = threading.Lock()
         
+    def set_install_dir(self, install_dir: Path):
+        """Point the installer and its derived paths at a new installation directory"""
+        self.install_dir = Path(install_dir)
+        self.demo_dir = self.install_dir / 'demo'
+        self.core_dir = self.install_dir / 'core'
+        self.log_file = self.install_dir / 'install.log'
+    
+    @property
+    def metrics_file(self) -> Path:
+        return self.log_file.with_name('install-metrics.json')
+    
+    @property
+    def profile_file(self) -> Path:
+        return self.log_file.with_name('install-profile.prof')
+    
+    def npm_cache_dir(self) -> Path:
+        """npm cache shared by every project installed through this cache directory"""
+        return self.cache_dir / 'npm'
+    
+    def install_state(self) -> InstallState:
+        """State file recording what previous runs installed"""
+        return InstallState(self.install_dir / 'install-state.json')
+    
+    def skip_step(self):
+        """Record that the calling thread's step had nothing to do"""
+        self.metrics.skip(self.current_step())
+    
+    def step_unchanged(self, section: str, key: str, inputs: dict, *outputs: Path) -> bool:
+        """Whether a step last completed with these inputs and its outputs still exist"""
+        return (self.install_state().get(section, key) == inputs and
+                all(path.exists() for path in outputs))
+    
+    def repo_revision(self, name: str) -> Optional[str]:
+        """Commit SHA or archive hash the named repository was last installed from"""
+        fetched = self.install_state().get('fetch', name)
+        # A tree installed with another profile has different files
+        if not fetched or fetched.get('profile', self.install_profile) != self.install_profile:
+            return None
+        return fetched['revision']
+    
+    def active_profile(self) -> InstallProfile:
+        """Path patterns of the selected install profile"""
+        name = self.install_profile
+        if name == 'full' and CONFIG['clone_strategy'] == 'sparse':
+            # A sparse clone of everything would be pointless
+            name = 'minimal'
+        return InstallProfile(name, **CONFIG['install_profiles'][name])
+    
     def log(self, message: str, level: str = 'INFO'):
         """Log a message"""
-        log_entry = f"[{level}] {message}"
-        print(log_entry)
-        
-        # Write to log file
-        if self.log_file.parent.exists():
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(f"{log_entry}\n")
+        log_entry = self.logger.write(level, message, self.current_step(), self.log_file)
+        if self.echo and (level != 'DEBUG' or self.verbose):
+            print(log_entry)
         
         # Call GUI callback if available
         if self.log_callback:
-            self.log_callback(log_entry)
+            self.notify(self.log_callback, log_entry)
+    
+    def set_step(self, step: Optional[str]):
+        """Tag subsequent log entries from this thread with a step ID"""
+        self.step_context.step = step
+        self.metrics.enter(step)
+    
+    def current_step(self) -> Optional[str]:
+        return getattr(self.step_context, 'step', None)
     
     def update_progress(self, value: int, message: str = ""):
         """Update progress"""
         if self.progress_callback:
-            self.progress_callback(value, message)
+            self.notify(self.progress_callback, value, message)
     
-    def check_command(self, command: str) -> Tuple[bool, str]:
-        """Check if a command is available"""
+    def notify(self, callback, *args):
+        """Invoke a callback on the thread driving the installation"""
+        if self.owner_thread is None or threading.get_ident() == self.owner_thread:
+            callback(*args)
+        else:
+            self.pending_events.put((callback, args))
+    
+    def dispatch_events(self):
+        """Deliver callbacks queued by worker threads"""
+        while True:
+            try:
+                callback, args = self.pending_events.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)
+    
+    def install_steps(self, install_core: bool = False) -> Dict[str, InstallStep]:
+        """The installation graph: what each step needs done before it can start"""
+        weights = CONFIG['progress_weights']
+        steps = [
+            InstallStep('requirements', self.require_system,
+                        tasks={'requirements': weights['requirements']},
+                        message="System requirements checked"),
+            InstallStep('directories', self.setup_directories, after=['requirements'],
+                        tasks={'directories': weights['directories']}, message="Directories created"),
+        ]
+        if self.bundle:
+            # Offline mode: every tree comes from the prebuilt bundle
+            steps.append(InstallStep('bundle', lambda: self.install_from_bundle(self.bundle, install_core),
+                                     after=['directories'], resource='io',
+                                     tasks={'bundle': weights['download'] + weights['extract']}))
+            sources = ['bundle']
+        else:
+            repositories = [('Demo', CONFIG['demo_repo'], CONFIG['demo_zip'], self.demo_dir)]
+            if install_core:
+                repositories.append(('Core', CONFIG['core_repo'], CONFIG['core_zip'], self.core_dir))
+            for name, repo_url, zip_url, destination in repositories:
+                steps.append(InstallStep(
+                    f"fetch:{name.lower()}",
+                    lambda args=(repo_url, zip_url, destination, name): self.clone_or_download_repo(*args),
+                    after=['directories'], resource='io',
+                    tasks={f"{name} download": weights['download'], f"{name} extract": weights['extract']}))
+            sources = ['fetch:demo']
+        steps += [
+            InstallStep('dependencies:demo', lambda: self.install_dependencies(self.demo_dir, 'Demo'),
+                        after=sources, resource='io',
+                        tasks={'Demo dependencies': weights['dependencies']}),
+            InstallStep('build:demo', lambda: self.build_project(self.demo_dir, 'Demo'),
+                        after=['dependencies:demo'], resource='cpu',
+                        tasks={'Demo build': weights['build']}),
+            InstallStep('environment', self.setup_environment, after=sources,
+                        tasks={'environment': weights['environment']}, message="Environment configured"),
+            # The dev server reads .env, so prime its caches once that exists
+            InstallStep('warmup:demo', lambda: self.warm_up(self.demo_dir, 'Demo'),
+                        after=['build:demo', 'environment'], resource='cpu',
+                        tasks={'Demo warmup': weights['warmup']}),
+            # Launchers embed paths and whichever build output the demo produced
+            InstallStep('launchers', self.create_launchers, after=['directories', 'build:demo'],
+                        tasks={'launchers': weights['launchers']}, message="Launcher scripts created"),
+        ]
+        return {step.name: step for step in steps}
+    
+    def progress_plan(self, steps: Dict[str, InstallStep]) -> Dict[str, float]:
+        """Weighted tasks making up the overall progress bar
+        
+        When earlier runs timed every step doing its work, each step weighs
+        what it took then (split across its tasks in the default ratio);
+        otherwise the default weights apply.
+        """
+        measured = self.previous_step_seconds()
+        use_measured = all(name in measured for name in steps)
+        plan = {}
+        for name, step in steps.items():
+            total = sum(step.tasks.values())
+            for task, weight in step.tasks.items():
+                plan[task] = max(measured[name], 0.05) * weight / total if use_measured else weight
+        return plan
+    
+    def previous_step_seconds(self) -> Dict[str, float]:
+        """Wall time of each step the last successful run that did not skip it"""
         try:
-            result = subprocess.run([command, '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            return result.returncode == 0, result.stdout.strip()
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False, ""
+            report = json.loads(self.metrics_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        return dict(report.get('step_seconds', {}))
+    
+    def run_steps(self, steps: Dict[str, InstallStep]):
+        """Run steps as soon as their dependencies complete, within the resource budgets
+        
+        After a failure no new step starts; the ones already running finish
+        and the first error is raised.
+        """
+        # Budgets are sized on first use, once the requirements step has tuned them
+        budgets = {}
+        budgets_lock = threading.Lock()
+        
+        def run_step(step):
+            budget = None
+            if step.resource:
+                with budgets_lock:
+                    if step.resource not in budgets:
+                        budgets[step.resource] = threading.Semaphore(self.budget_slots(step.resource))
+                    budget = budgets[step.resource]
+            # Time spent waiting for a slot is not part of the step
+            if budget:
+                budget.acquire()
+            try:
+                self.set_step(step.name)
+                self.check_cancelled()
+                step.run()
+                for task in step.tasks:
+                    self.progress.complete(task, step.message)
+            finally:
+                self.set_step(None)
+                if budget:
+                    budget.release()
+        
+        done = set()
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            while True:
+                if error is None:
+                    for name, step in steps.items():
+                        if name not in done and name not in running.values() and step.after <= done:
+                            running[executor.submit(run_step, step)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+                self.dispatch_events()
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                    else:
+                        done.add(name)
+            self.dispatch_events()
+        
+        if error is not None:
+            raise error
+        unreachable = set(steps) - done
+        if unreachable:
+            raise RuntimeError(f"Install steps with unmet dependencies: {', '.join(sorted(unreachable))}")
+    
+    def cancel(self):
+        """Stop the installation and terminate any running child processes"""
+        self.cancel_event.set()
+        with self.children_lock:
+            children = list(self.children)
+        for process in children:
+            terminate_process_tree(process)
+    
+    def check_cancelled(self):
+        """Abort the current step if the user has cancelled"""
+        if self.cancel_event.is_set():
+            raise InstallCancelled("Installation cancelled by user")
+    
+    def run_command(self, command, cwd: Optional[Path] = None,
+                    env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+        """Run a child process, streaming its output into the log
+        
+        stdout and stderr are logged line by line at DEBUG level while only
+        the last CONFIG['output_tail_kb'] are kept for error reports, so
+        memory stays flat however noisy the command is. cancel() terminates
+        the process tree, and so does a stall with no output for
+        CONFIG['stall_timeout_seconds'].
+        """
+        self.check_cancelled()
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            # Own process group so cancel() also reaches npm's and git's children
+            kwargs['start_new_session'] = True
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                                   text=True, errors='replace', bufsize=1, **kwargs)
+        with self.children_lock:
+            self.children.add(process)
+        
+        label = ' '.join(str(part) for part in command[:2])
+        tail = OutputTail(CONFIG['output_tail_kb'] * 1024)
+        lines = queue.Queue(maxsize=1000)
+        
+        def pump(pipe):
+            try:
+                for line in pipe:
+                    lines.put(line.rstrip('\n'))
+            finally:
+                pipe.close()
+                lines.put(None)
+        
+        readers = [threading.Thread(target=pump, args=(pipe,), daemon=True)
+                   for pipe in (process.stdout, process.stderr)]
+        for reader in readers:
+            reader.start()
+        
+        try:
+            open_streams = len(readers)
+            last_output = time.monotonic()
+            last_warning = 0.0
+            while open_streams:
+                try:
+                    line = lines.get(timeout=1.0)
+                except queue.Empty:
+                    idle = time.monotonic() - last_output
+                    if idle >= CONFIG['stall_timeout_seconds']:
+                        terminate_process_tree(process)
+                        raise CommandStalled(f"{label} produced no output for {int(idle)}s and was stopped")
+                    if idle >= CONFIG['stall_warning_seconds'] and \
+                            idle - last_warning >= CONFIG['stall_warning_seconds']:
+                        last_warning = idle
+                        self.log(f"⏳ No output from {label} for {int(idle)}s...", 'WARNING')
+                    continue
+                if line is None:
+                    open_streams -= 1
+                    continue
+                last_output = time.monotonic()
+                last_warning = 0.0
+                tail.append(line)
+                self.log(f"{label}: {line}", 'DEBUG')
+            usage = self.wait_for_child(process)
+            if usage is not None:
+                self.metrics.record_child(self.current_step(), usage)
+        finally:
+            with self.children_lock:
+                self.children.discard(process)
+        
+        self.check_cancelled()
+        if process.returncode != 0:
+            self.log(f"Last output of {label} (exit code {process.returncode}):\n{tail.text()}", 'ERROR')
+            raise subprocess.CalledProcessError(process.returncode, command, tail.text())
+        return subprocess.CompletedProcess(command, process.returncode, tail.text())
+    
+    def wait_for_child(self, process: subprocess.Popen):
+        """Reap a child process, returning its resource usage where the OS reports it"""
+        if not hasattr(os, 'wait4'):
+            process.wait()
+            return None
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            # Already reaped by a concurrent poll() from cancel()
+            process.wait()
+            return None
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
+        else:
+            process.returncode = os.WEXITSTATUS(status)
+        return usage
+    
+    def probe_commands(self, commands: Iterable[str]) -> Dict[str, Tuple[bool, str]]:
+        """Probe several commands concurrently under a single overall deadline"""
+        commands = list(commands)
+        deadline = time.monotonic() + CONFIG['probe_timeout']
+        running = {}
+        
+        # Launch every version check at once
+        for command in commands:
+            if command in self.command_cache or command in running:
+                continue
+            try:
+                running[command] = subprocess.Popen([command, '--version'],
+                                                    stdout=subprocess.PIPE,
+                                                    stderr=subprocess.DEVNULL,
+                                                    text=True)
+            except OSError:
+                self.command_cache[command] = (False, "")
+        
+        # Collect results, killing anything still running at the deadline
+        for command, process in running.items():
+            try:
+                stdout, _ = process.communicate(timeout=max(0.0, deadline - time.monotonic()))
+                self.command_cache[command] = (process.returncode == 0, stdout.strip())
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                self.command_cache[command] = (False, "")
+        
+        return {command: self.command_cache[command] for command in commands}
+    
+    def check_command(self, command: str) -> Tuple[bool, str]:
+        """Check if a command is available (cached for the current run)"""
+        if command not in self.command_cache:
+            self.probe_commands([command])
+        return self.command_cache[command]
     
     def check_system_requirements(self) -> bool:
         """Check system requirements"""
@@ -84,6 +1916,10 @@ class AnarQQInstaller:
         python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
         self.log(f"Python version: {python_version}")
         
+        # Probe the whole toolchain at once; later steps read the cached results
+        self.command_cache.clear()
+        self.probe_commands(['node', 'npm', 'git', 'docker'])
+        
         # Check Node.js
         node_available, node_version = self.check_command('node')
         if node_available:
@@ -126,8 +1962,83 @@ class AnarQQInstaller:
         except Exception as e:
             self.log(f"⚠️ Could not check disk space: {e}", 'WARNING')
         
+        # Check memory
+        total_memory, available_memory = host_memory()
+        if total_memory is None:
+            self.log("⚠️ Could not check memory", 'WARNING')
+        elif total_memory >= CONFIG['required_memory_gb'] * 1024 ** 3:
+            self.log(f"✅ Memory: {total_memory / 1024 ** 3:.1f}GB")
+        else:
+            self.log(f"⚠️ Low memory: {total_memory / 1024 ** 3:.1f}GB "
+                     f"(recommended: {CONFIG['required_memory_gb']}GB), builds may fail", 'WARNING')
+        
+        # Size parallelism to this host
+        probe_dir = self.install_dir
+        while not probe_dir.exists() and probe_dir != probe_dir.parent:
+            probe_dir = probe_dir.parent
+        throughput = disk_write_throughput(probe_dir, CONFIG['disk_probe_mb'] * 1024 * 1024)
+        self.tuning = self.tuning_profile(host_cpu_count(), available_memory, throughput)
+        self.log_tuning(self.tuning)
+        
         return errors == 0
     
+    def tuning_profile(self, cpus: int, available_memory: Optional[int],
+                       disk_throughput: Optional[float]) -> dict:
+        """Parallelism and memory settings for a host"""
+        # Spinning disks and network filesystems gain little from more writers
+        slow_disk = disk_throughput is not None and disk_throughput < 100 * 1024 ** 2
+        memory_gb = available_memory / 1024 ** 3 if available_memory else None
+        # Every concurrent Node build can use a couple of GB
+        cpu_slots = max(1, min(cpus // 4, int(memory_gb // 2) if memory_gb else 1))
+        return {
+            'cpus': cpus,
+            'memory_gb': round(memory_gb, 1) if memory_gb else None,
+            'disk_mb_per_s': round(disk_throughput / 1024 ** 2) if disk_throughput else None,
+            'download_connections': 4 if cpus >= 4 else 2,
+            'extract_workers': max(1, min(2 if slow_disk else 8, cpus)),
+            'step_budget': {'io': 2 if slow_disk or cpus < 4 else 3, 'cpu': cpu_slots},
+            # libuv's pool does npm's file I/O and defaults to 4 threads
+            'uv_threadpool_size': max(4, min(cpus, 16)),
+            # Half the free memory per build, within what Node handles well
+            'node_heap_mb': max(1024, min(8192, int(memory_gb * 1024 / 2 / cpu_slots)))
+                            if memory_gb else None,
+        }
+    
+    def log_tuning(self, tuning: dict):
+        memory = f"{tuning['memory_gb']}GB free" if tuning['memory_gb'] else "unknown free memory"
+        disk = f"disk {tuning['disk_mb_per_s']} MB/s" if tuning['disk_mb_per_s'] else "unknown disk speed"
+        connections = self.download_connections or tuning['download_connections']
+        io_slots = self.step_budget.get('io') or tuning['step_budget']['io']
+        cpu_slots = self.step_budget.get('cpu') or tuning['step_budget']['cpu']
+        heap = f", Node heap {tuning['node_heap_mb']} MB" if tuning['node_heap_mb'] else ""
+        self.log(f"⚙️ Tuning for {tuning['cpus']} CPUs, {memory}, {disk}: "
+                 f"{connections} download connections, {tuning['extract_workers']} extraction workers, "
+                 f"{io_slots} I/O and {cpu_slots} CPU steps at once, "
+                 f"libuv pool {tuning['uv_threadpool_size']}{heap}")
+    
+    def connections(self) -> int:
+        """Download connections per file: the user's choice or the tuned value"""
+        return self.download_connections or self.tuning['download_connections']
+    
+    def budget_slots(self, resource: str) -> int:
+        """Steps of a resource kind allowed at once: the user's choice or the tuned value"""
+        return self.step_budget.get(resource) or self.tuning['step_budget'].get(resource, 1)
+    
+    def node_environment(self) -> Dict[str, str]:
+        """Environment for npm and Node builds, sized from the tuning profile"""
+        env = dict(os.environ)
+        env.setdefault('UV_THREADPOOL_SIZE', str(self.tuning['uv_threadpool_size']))
+        if self.tuning['node_heap_mb'] and '--max-old-space-size' not in env.get('NODE_OPTIONS', ''):
+            env['NODE_OPTIONS'] = (env.get('NODE_OPTIONS', '') +
+                                   f" --max-old-space-size={self.tuning['node_heap_mb']}").strip()
+        return env
+    
+    def require_system(self):
+        """Fail the installation unless the system requirements are met"""
+        if not self.check_system_requirements():
+            self.log("❌ System requirements not met", 'ERROR')
+            raise RuntimeError("System requirements not met")
+    
     def setup_directories(self):
         """Setup installation directories"""
         self.log("Setting up directories...")
@@ -139,91 +2050,1157 @@ class AnarQQInstaller:
         # Create log file
         self.log_file.touch()
         
+        # Old trees whose background removal was interrupted last time
+        for pattern in ('.*.trash-*', '.*.replaced'):
+            for leftover in self.install_dir.glob(pattern):
+                self.remove_in_background(leftover)
+        
         self.log(f"✅ Directories created at: {self.install_dir}")
     
-    def download_file(self, url: str, destination: Path, description: str = ""):
-        """Download a file with progress"""
+    def download_file(self, url: str, destination: Path, description: str = "",
+                      stream: Optional[str] = None, sink=None,
+                      validators: Optional[dict] = None) -> Optional[dict]:
+        """Download a file with progress, resuming interrupted transfers
+        
+        If a sink (an object with feed() and tell()) is given, every byte of
+        the file is also fed to it in order, as early as possible. Conditional
+        request headers in validators make the download return None when the
+        server answers 304 Not Modified; otherwise the response's ETag and
+        Last-Modified are returned, with the file's SHA-256 computed as its
+        bytes were written.
+        """
         self.log(f"Downloading {description or url}...")
         
-        def progress_hook(block_num, block_size, total_size):
-            if total_size > 0:
-                percent = min(100, (block_num * block_size * 100) // total_size)
-                self.update_progress(percent, f"Downloading {description}... {percent}%")
+        task = f"{stream} download" if stream else 'download'
+        
+        def report(received: int, total: int):
+            self.progress.update_bytes(task, received, total, f"Downloading {description}")
+        
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        part_file = destination.with_name(destination.name + '.part')
+        meta_file = destination.with_name(destination.name + '.part.json')
+        # Every byte is hashed on its way through, never in a second pass
+        sink = DigestSink(sink)
+        
+        connections = self.connections()
+        target = self.probe_download(url, validators) if connections > 1 else None
+        if target and target.get('not_modified'):
+            return None
+        if target:
+            try:
+                meta = self.download_segmented(target, part_file, meta_file, report)
+            except RangesIgnored as e:
+                # The ranges fetched so far cannot be trusted to be the same file
+                self.log(f"ℹ️ {e}, downloading again over a single connection")
+                self.discard_partial(part_file, meta_file)
+                target = None
+        elif connections > 1:
+            self.log("ℹ️ Server does not support ranged downloads, using a single connection")
+        if not target:
+            meta = self.download_stream(url, part_file, meta_file, report, description, sink,
+                                        validators)
+            if meta is None:
+                return None
+        
+        # Segmented downloads arrive out of order, so their sink is fed afterwards
+        self.feed_from_file(sink, part_file, sink.tell())
+        
+        os.replace(part_file, destination)
+        meta_file.unlink()
+        detail = f" ({connections} connections)" if target else ""
+        self.log(f"✅ Downloaded: {destination}{detail}")
+        return {'etag': meta.get('etag'), 'last_modified': meta.get('last_modified'),
+                'sha256': sink.hexdigest()}
+    
+    def download_stream(self, url: str, part_file: Path, meta_file: Path, report,
+                        description: str = "", sink=None,
+                        validators: Optional[dict] = None) -> Optional[dict]:
+        """Download over a single connection, resuming after interruptions
+        
+        Every retry continues from the bytes already on disk; the attempt
+        count only grows while retries make no progress.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            received = self.partial_size(part_file)
+            try:
+                return self.download_attempt(url, part_file, meta_file, report, sink, validators)
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    return None
+                if e.code == 416 and attempt < CONFIG['download_retries']:
+                    # Our partial file no longer matches the remote resource
+                    self.discard_partial(part_file, meta_file)
+                    continue
+                delay = self.http.retry_delay('GET', attempt, e)
+                if delay is None:
+                    raise
+                self.log(f"⚠️ Download of {description or url} failed (HTTP {e.code}), "
+                         f"retrying in {delay:.1f}s...", 'WARNING')
+            except (http.client.HTTPException, OSError) as e:
+                if self.partial_size(part_file) > received:
+                    attempt = 0
+                delay = self.http.retry_delay('GET', max(attempt, 1), e)
+                if delay is None:
+                    raise
+                self.log(f"⚠️ Download of {description or url} interrupted ({e}), "
+                         f"resuming in {delay:.1f}s...", 'WARNING')
+            self.wait_before_retry(delay)
+    
+    def partial_size(self, part_file: Path) -> int:
+        """Bytes of a partial download already on disk"""
+        try:
+            return part_file.stat().st_size
+        except OSError:
+            return 0
+    
+    def wait_before_retry(self, delay: float):
+        """Sleep out a retry backoff, waking early if the user cancels"""
+        self.cancel_event.wait(delay)
+        self.check_cancelled()
+    
+    def feed_from_file(self, sink, path: Path, start: int, end: Optional[int] = None):
+        """Feed bytes [start, end) of a local file to a sink"""
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = (end - start) if end is not None else None
+            while remaining is None or remaining > 0:
+                self.check_cancelled()
+                size = CONFIG['download_chunk_size']
+                chunk = f.read(size if remaining is None else min(size, remaining))
+                if not chunk:
+                    break
+                sink.feed(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+    
+    def download_attempt(self, url: str, part_file: Path, meta_file: Path, report, sink=None,
+                         validators: Optional[dict] = None) -> dict:
+        """Fetch the remainder of a partial download into part_file"""
+        phase = self.current_step()
+        meta = {}
+        if part_file.exists() and meta_file.exists():
+            try:
+                meta = json.loads(meta_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+        if meta.get('url') != url:
+            self.discard_partial(part_file, meta_file)
+            meta = {}
+        
+        offset = part_file.stat().st_size if meta else 0
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            if meta.get('etag'):
+                headers['If-Range'] = meta['etag']
+        elif validators:
+            headers.update(validators)
+        
+        with self.http.open('GET', url, headers) as response:
+            etag = response.headers.get('ETag')
+            if offset and response.status == 206:
+                content_range = response.headers.get('Content-Range', '')
+                range_spec, _, total_spec = content_range.partition('/')
+                if (not range_spec.startswith(f"bytes {offset}-") or
+                        (meta.get('etag') and etag and etag != meta['etag'])):
+                    raise IOError(f"Server resumed a different resource for {url}")
+                total = int(total_spec) if total_spec.isdigit() else meta.get('total', 0)
+                mode = 'ab'
+            else:
+                # Server ignored the range or the resource changed: start over
+                offset = 0
+                length = response.headers.get('Content-Length')
+                total = int(length) if length and length.isdigit() else 0
+                mode = 'wb'
+            
+            meta = {'url': url, 'etag': etag, 'total': total,
+                    'last_modified': response.headers.get('Last-Modified')}
+            meta_file.write_text(json.dumps(meta), encoding='utf-8')
+            
+            # Bring the sink up to the resume offset before new bytes arrive
+            if sink is not None:
+                if sink.tell() > offset:
+                    sink.reset()
+                if sink.tell() < offset:
+                    self.feed_from_file(sink, part_file, sink.tell(), offset)
+            
+            received = offset
+            report(received, total)
+            with open(part_file, mode) as f:
+                while True:
+                    self.check_cancelled()
+                    chunk = response.read(CONFIG['download_chunk_size'])
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    self.count_transfer(phase, len(chunk))
+                    if sink is not None:
+                        sink.feed(chunk)
+                    received += len(chunk)
+                    report(received, total)
         
-        urllib.request.urlretrieve(url, destination, progress_hook)
-        self.log(f"✅ Downloaded: {destination}")
+        if total and received != total:
+            raise IOError(f"Incomplete download: received {received} of {total} bytes")
+        return meta
     
-    def extract_zip(self, zip_path: Path, extract_to: Path, description: str = ""):
-        """Extract a ZIP file"""
+    def probe_download(self, url: str, validators: Optional[dict] = None) -> Optional[dict]:
+        """Ask the server whether a URL can be fetched in byte ranges"""
+        try:
+            with self.http.request('HEAD', url, validators, self.cancel_event) as response:
+                length = response.headers.get('Content-Length', '')
+                if (response.headers.get('Accept-Ranges', '').lower() != 'bytes' or
+                        not length.isdigit()):
+                    return None
+                total = int(length)
+                if total < 2 * CONFIG['min_segment_size']:
+                    return None
+                # Segments go straight to the final location after redirects
+                return {'url': response.geturl(), 'source': url, 'total': total,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')}
+        except urllib.error.HTTPError as e:
+            return {'not_modified': True} if e.code == 304 else None
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
+            return None
+    
+    def download_segmented(self, target: dict, part_file: Path, meta_file: Path, report):
+        """Download byte ranges concurrently into a preallocated file"""
+        total = target['total']
+        meta = {}
+        if part_file.exists() and meta_file.exists():
+            try:
+                meta = json.loads(meta_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+        
+        # Resume only if the previous attempt fetched the same resource
+        if (meta.get('url') != target['source'] or meta.get('total') != total or
+                meta.get('etag') != target['etag'] or not meta.get('segments') or
+                part_file.stat().st_size != total):
+            self.discard_partial(part_file, meta_file)
+            count = min(self.connections(), total // CONFIG['min_segment_size'])
+            size = total // count
+            segments = [[i * size, (i + 1) * size - 1 if i < count - 1 else total - 1, 0]
+                        for i in range(count)]
+            meta = {'url': target['source'], 'etag': target['etag'], 'total': total,
+                    'last_modified': target['last_modified'], 'segments': segments}
+            with open(part_file, 'wb') as f:
+                f.truncate(total)
+        
+        segments = meta['segments']
+        lock = threading.Lock()
+        # Segments run on pool threads, which carry no step of their own
+        phase = self.current_step()
+        
+        def save_meta():
+            with lock:
+                meta_file.write_text(json.dumps(meta), encoding='utf-8')
+        
+        # One segment giving up stops the others instead of letting them finish
+        stop = threading.Event()
+        
+        def fetch_segment(segment):
+            try:
+                fetch_range(segment)
+            except BaseException:
+                stop.set()
+                raise
+        
+        def fetch_range(segment):
+            attempt = 0
+            while segment[0] + segment[2] <= segment[1] and not stop.is_set():
+                attempt += 1
+                received = segment[2]
+                headers = {'Range': f"bytes={segment[0] + segment[2]}-{segment[1]}"}
+                if target['etag']:
+                    headers['If-Range'] = target['etag']
+                try:
+                    with self.http.open('GET', target['url'], headers) as response, \
+                            open(part_file, 'r+b') as f:
+                        if response.status != 206:
+                            raise RangesIgnored(f"Server stopped honouring byte ranges for {target['source']}")
+                        f.seek(segment[0] + segment[2])
+                        while not stop.is_set():
+                            self.check_cancelled()
+                            chunk = response.read(CONFIG['download_chunk_size'])
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            self.count_transfer(phase, len(chunk))
+                            with lock:
+                                segment[2] += len(chunk)
+                                done = sum(s[2] for s in segments)
+                            report(done, total)
+                    if segment[0] + segment[2] <= segment[1] and not stop.is_set():
+                        # A clean close before the range ends is a truncated response
+                        raise IOError(f"Byte range of {target['source']} ended early")
+                except RangesIgnored:
+                    raise
+                except (http.client.HTTPException, OSError) as e:
+                    # A segment that made progress resumes with a fresh retry budget
+                    if segment[2] > received:
+                        attempt = 1
+                    delay = self.http.retry_delay('GET', attempt, e)
+                    if delay is None:
+                        raise
+                    save_meta()
+                    self.wait_before_retry(delay)
+        
+        save_meta()
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(fetch_segment, segment) for segment in segments]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                save_meta()
+        return meta
+    
+    def count_transfer(self, phase: Optional[str], size: int):
+        """Account bytes received from the network and written to a partial download"""
+        self.metrics.add(phase, 'bytes_downloaded', size)
+        self.metrics.add(phase, 'bytes_written', size)
+    
+    def discard_partial(self, part_file: Path, meta_file: Path):
+        """Remove a partial download and its metadata"""
+        for path in (part_file, meta_file):
+            if path.exists():
+                path.unlink()
+    
+    def extract_zip(self, zip_path: Path, extract_to: Path, description: str = "",
+                    strip_components: int = 0, task: Optional[str] = None,
+                    profile: Optional[InstallProfile] = None):
+        """Extract a ZIP file, optionally dropping leading path components
+        
+        Downloads are extracted by StreamingZipExtractor as they arrive; this
+        only runs for archives it cannot handle (encrypted entries, methods
+        other than stored or deflated, stored entries with data descriptors).
+        With more than one extraction worker and at least
+        parallel_extract_min_files files and parallel_extract_min_mb of
+        content, members are inflated by a pool of worker processes, each with
+        its own ZipFile handle and a share of the members balanced by
+        compressed size; smaller archives are extracted in-process.
+        """
         self.log(f"Extracting {description or zip_path.name}...")
         
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_to)
+            files = []
+            skipped = 0
+            for member in zip_ref.infolist():
+                path = archive_member_path(extract_to, member.filename, strip_components)
+                if path is None:
+                    continue
+                if profile is not None and not profile.selects(
+                        path.relative_to(extract_to).as_posix(), member.is_dir()):
+                    skipped += not member.is_dir()
+                    continue
+                if member.is_dir():
+                    path.mkdir(parents=True, exist_ok=True)
+                else:
+                    files.append((member, path))
+        
+        if skipped:
+            self.log(f"ℹ️ Skipped {skipped} files outside the '{profile.name}' install profile")
+        
+        # Directories are created once here rather than by every worker
+        for directory in {path.parent for _, path in files}:
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        entries = [(member.filename, str(path), member.external_attr >> 16) for member, path in files]
+        sizes = [member.compress_size for member, _ in files]
+        workers = min(self.tuning['extract_workers'], len(entries))
+        parallel = (workers > 1 and len(entries) >= CONFIG['parallel_extract_min_files'] and
+                    sum(member.file_size for member, _ in files) >= CONFIG['parallel_extract_min_mb'] * 1024 ** 2)
         
-        self.log(f"✅ Extracted to: {extract_to}")
+        written = 0
+        if parallel:
+            try:
+                written = self.extract_zip_parallel(zip_path, entries, sizes, workers, task)
+                self.log(f"✅ Extracted to: {extract_to} ({workers} worker processes)")
+            except (OSError, BrokenProcessPool) as e:
+                self.log(f"⚠️ Parallel extraction unavailable ({e}), extracting in-process", 'WARNING')
+                parallel = False
+        if not parallel:
+            written = extract_zip_members(str(zip_path), entries)
+            self.log(f"✅ Extracted to: {extract_to}")
+        self.metrics.add(self.current_step(), 'bytes_written', written)
+    
+    def extract_zip_parallel(self, zip_path: Path, entries: list, sizes: list, workers: int,
+                             task: Optional[str] = None) -> int:
+        """Extract entries across worker processes, reporting progress per batch"""
+        # Several batches per worker keep the pool busy and progress moving
+        batches = partition_members(entries, sizes, workers * 4)
+        batch_sizes = [len(batch) for batch in batches]
+        written = 0
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(extract_zip_members, str(zip_path), batch): count
+                       for batch, count in zip(batches, batch_sizes)}
+            pending = set(futures)
+            try:
+                while pending:
+                    finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    self.check_cancelled()
+                    for future in finished:
+                        written += future.result()
+                        done += futures[future]
+                        if task:
+                            self.progress.update(task, done / len(entries),
+                                                 f"Extracting... {done}/{len(entries)} files")
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return written
     
     def clone_or_download_repo(self, repo_url: str, zip_url: str, destination: Path, name: str):
         """Clone repository or download ZIP as fallback"""
         git_available, _ = self.check_command('git')
+        state = self.install_state()
         
         if git_available:
             try:
                 self.log(f"Cloning {name} repository...")
                 if destination.exists() and (destination / '.git').exists():
-                    # Update existing repository
-                    subprocess.run(['git', 'pull', 'origin', 'main'], 
-                                 cwd=destination, check=True, capture_output=True)
-                    self.log(f"✅ Updated {name} repository")
+                    self.update_repo(destination, name)
                 else:
-                    # Clone new repository
-                    subprocess.run(['git', 'clone', repo_url, str(destination)], 
-                                 check=True, capture_output=True)
-                    self.log(f"✅ Cloned {name} repository")
+                    self.clone_repo(repo_url, destination, name)
+                    state.record('fetch', name, {'source': 'git', 'profile': self.install_profile,
+                                                 'revision': self.git_revision(destination)})
+                self.progress.complete(f"{name} download")
+                self.progress.complete(f"{name} extract", f"{name} repository ready")
                 return
             except subprocess.CalledProcessError as e:
                 self.log(f"⚠️ Git clone failed: {e}", 'WARNING')
         
         # Fallback to ZIP download
         self.log(f"Downloading {name} as ZIP...")
-        with tempfile.TemporaryDirectory() as temp_dir:
-            zip_path = Path(temp_dir) / f"{name}.zip"
-            self.download_file(zip_url, zip_path, f"{name} repository")
-            
-            # Extract ZIP
-            extract_path = Path(temp_dir) / 'extracted'
-            self.extract_zip(zip_path, extract_path, f"{name} repository")
+        # Partial downloads live in the cache so they survive installer restarts;
+        # while another installer sharing the cache holds one, use a private name
+        downloads = self.cache_dir / 'downloads'
+        download_lock = FileLock(downloads / f"{name.lower()}.zip.lock")
+        if download_lock.acquire(blocking=False):
+            zip_path = downloads / f"{name.lower()}.zip"
+        else:
+            zip_path = downloads / f"{name.lower()}.{socket.gethostname()}-{os.getpid()}.zip"
+            self.log(f"ℹ️ Another installer is downloading {name} into the shared cache, "
+                     f"using a separate partial download")
+        
+        # Entries are extracted while the archive downloads, straight into a
+        # staging directory on the destination's filesystem, minus the
+        # leading "repo-main/" component
+        staging_dir = destination.parent / f".{destination.name}.staging"
+        profile = self.active_profile()
+        extractor = StreamingZipExtractor(staging_dir, strip_components=1,
+                                          profile=None if profile.full else profile)
+        extract_task = f"{name} extract"
+        archive_size = {'total': 0}
+        
+        def report_extraction(position: int):
+            if archive_size['total']:
+                self.progress.update_bytes(extract_task, position, archive_size['total'],
+                                           f"Extracting {name}")
+            else:
+                # Streaming: extraction keeps pace with the download
+                self.progress.update_bytes(extract_task, position,
+                                           self.progress.total(f"{name} download"),
+                                           f"Downloading and extracting {name}")
+        
+        sink = ProgressSink(extractor, report_extraction)
+        cache = self.archive_cache()
+        cached = cache.lookup(zip_url)
+        try:
+            validators = self.download_file(zip_url, zip_path, f"{name} repository", stream=name,
+                                            sink=sink,
+                                            validators=cache.validators(cached) if cached else None)
+            if validators is None:
+                archive = cache.touch(zip_url)
+                self.progress.complete(f"{name} download")
+                # Cache objects are named after their SHA-256
+                self.verify_archive(zip_url, archive.stem, name)
+                # setup_directories leaves an empty destination behind, so only
+                # the extracted package.json shows the tree is really there
+                fetched = {'source': 'zip', 'profile': self.install_profile, 'revision': archive.stem}
+                if self.step_unchanged('fetch', name, fetched, destination / 'package.json'):
+                    self.log(f"✅ {name} archive unchanged since last install, skipping extraction")
+                    self.skip_step()
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    self.progress.complete(extract_task, f"{name} repository ready")
+                    return
+                # Upstream unchanged: extract the cached archive instead
+                self.log(f"♻️ {name} archive unchanged upstream, using cached copy")
+                archive_size['total'] = archive.stat().st_size
+                cached_copy = DigestSink(sink)
+                self.feed_from_file(cached_copy, archive, 0)
+                if cached_copy.hexdigest() != archive.stem:
+                    archive.unlink()
+                    raise IntegrityError(f"Cached {name} archive is corrupted and was removed; "
+                                         f"run the installer again to download it")
+            else:
+                try:
+                    self.verify_archive(zip_url, validators['sha256'], name)
+                except IntegrityError:
+                    zip_path.unlink()
+                    raise
+                archive = cache.store(zip_url, zip_path, validators, validators['sha256'])
+            extractor.close()
+            self.metrics.add(self.current_step(), 'bytes_written', extractor.bytes_written)
+            if extractor.unsupported:
+                self.log(f"ℹ️ {name} archive cannot be streamed ({extractor.unsupported}), extracting after download")
+                extractor.reset()
+                self.extract_zip(archive, staging_dir, f"{name} repository", strip_components=1,
+                                 task=extract_task, profile=extractor.profile)
+            elif extractor.files_skipped:
+                self.log(f"ℹ️ Skipped {extractor.files_skipped} files outside the "
+                         f"'{profile.name}' install profile")
             
-            # Move contents to destination
-            extracted_dirs = list(extract_path.iterdir())
-            if extracted_dirs:
-                source_dir = extracted_dirs[0]  # Usually the first directory
-                if destination.exists():
-                    shutil.rmtree(destination)
-                shutil.move(str(source_dir), str(destination))
-                self.log(f"✅ Downloaded and extracted {name}")
+            # Only verified content replaces the installed tree
+            self.swap_in(staging_dir, destination, name)
+            state.record('fetch', name, {'source': 'zip', 'profile': self.install_profile,
+                                         'revision': archive.stem})
+        except BaseException:
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir, ignore_errors=True)
+            if download_lock.handle is None:
+                # Nobody would ever resume a private partial download
+                self.discard_partial(zip_path.with_name(zip_path.name + '.part'),
+                                     zip_path.with_name(zip_path.name + '.part.json'))
+            raise
+        finally:
+            download_lock.release()
+        
+        self.progress.complete(extract_task, f"{name} repository ready")
+        self.log(f"✅ Downloaded and extracted {name}")
+    
+    def verify_archive(self, url: str, digest: str, name: str):
+        """Check an archive's SHA-256 against its pin, if it has one"""
+        expected = self.archive_pins.get(url)
+        if expected is None:
+            self.log(f"{name} archive SHA-256: {digest} (not pinned)", 'DEBUG')
+            return
+        if digest != expected.lower():
+            self.log(f"❌ {name} archive SHA-256 mismatch: expected {expected}, got {digest}", 'ERROR')
+            raise IntegrityError(f"{name} archive does not match its pinned SHA-256")
+        self.log(f"✅ {name} archive matches its pinned SHA-256")
+    
+    def load_archive_manifest(self, manifest: Path):
+        """Pin archive digests from a JSON manifest: {"archives": {url: sha256}}"""
+        archives = json.loads(manifest.read_text(encoding='utf-8')).get('archives', {})
+        self.archive_pins.update({url: digest.lower() for url, digest in archives.items()})
+    
+    def archive_cache(self) -> ArchiveCache:
+        """The download cache shared by every installation using this cache directory"""
+        return ArchiveCache(self.cache_dir / 'archives', CONFIG['cache_max_mb'] * 1024 * 1024)
+    
+    def swap_in(self, staging_dir: Path, destination: Path, name: str):
+        """Replace destination with a tree staged next to it, by directory renames
+        
+        Nothing is copied or deleted up front: local state listed in
+        CONFIG['preserve_on_update'] moves into the staged tree, the old tree
+        is renamed aside and kept until the installation succeeds, so a
+        failure later on rolls back instantly (see finish_updates).
+        """
+        state = self.install_state()
+        fetched = state.get('fetch', name)
+        state.record('fetch', name, None)
+        if destination.exists() and not any(destination.iterdir()):
+            # Only the empty directory setup_directories made
+            destination.rmdir()
+        if not destination.exists():
+            os.replace(staging_dir, destination)
+            return
+        
+        previous = destination.with_name(f".{destination.name}.previous")
+        if destination in self.swapped:
+            # Swapped before in this run: .previous holds what the run started
+            # with and stays the rollback target, so discard the tree in between
+            aside = destination.with_name(f".{destination.name}.replaced")
+        else:
+            aside = previous
+        if aside.exists():
+            self.remove_in_background(aside)
+        moved = self.move_entries(destination, staging_dir, CONFIG['preserve_on_update'])
+        os.replace(destination, aside)
+        try:
+            os.replace(staging_dir, destination)
+        except OSError:
+            os.replace(aside, destination)
+            self.move_entries(staging_dir, destination, moved)
+            state.record('fetch', name, fetched)
+            raise
+        if aside != previous:
+            self.remove_in_background(aside)
+        else:
+            self.swapped[destination] = {'name': name, 'previous': previous,
+                                         'fetch': fetched, 'moved': moved}
+        self.log(f"♻️ {name} tree replaced; the previous one is kept until the installation succeeds")
+    
+    def move_entries(self, source: Path, target: Path, entries) -> list:
+        """Rename the named entries of source into target where target lacks them"""
+        moved = []
+        for entry in entries:
+            if (source / entry).exists() and not (target / entry).exists():
+                os.replace(source / entry, target / entry)
+                moved.append(entry)
+        return moved
+    
+    def finish_updates(self, success: bool):
+        """Discard the trees replaced during this run, or put them back after a failure"""
+        state = self.install_state()
+        for destination, update in reversed(list(self.swapped.items())):
+            previous, name = update['previous'], update['name']
+            if success:
+                self.remove_in_background(previous)
+                continue
+            try:
+                failed = destination.with_name(f".{destination.name}.failed")
+                if failed.exists():
+                    self.remove_in_background(failed)
+                os.replace(destination, failed)
+                self.move_entries(failed, previous, update['moved'])
+                os.replace(previous, destination)
+                state.record('fetch', name, update['fetch'])
+                self.remove_in_background(failed)
+                self.log(f"↩️ Restored the previous {name} tree")
+            except OSError as e:
+                self.log(f"⚠️ Could not restore the previous {name} tree ({previous}): {e}", 'WARNING')
+        self.swapped.clear()
+    
+    def remove_in_background(self, path: Path):
+        """Delete a directory tree without making the installation wait for it
+        
+        The tree is first renamed to a .trash name, so it is out of the way at
+        once and a removal interrupted by exit is finished by the next run.
+        The thread is not a daemon: the process completes the removal before
+        it exits.
+        """
+        trash = path
+        if '.trash-' not in path.name:
+            trash = path.with_name(f"{path.name}.trash-{time.time_ns()}")
+            try:
+                os.replace(path, trash)
+            except OSError as e:
+                self.log(f"⚠️ Could not remove {path}: {e}", 'WARNING')
+                return
+        threading.Thread(target=shutil.rmtree, args=(trash,), kwargs={'ignore_errors': True},
+                         name=f"remove {trash.name}").start()
+    
+    def clone_repo(self, repo_url: str, destination: Path, name: str):
+        """Clone a repository using the configured strategy"""
+        strategy = CONFIG['clone_strategy']
+        branch = CONFIG['repo_branch']
+        profile = self.active_profile()
+        command = ['git', 'clone', '--branch', branch]
+        if strategy not in ('full', 'shallow', 'blobless', 'sparse'):
+            raise ValueError(f"Unknown clone strategy: {strategy}")
+        if strategy in ('shallow', 'sparse'):
+            command += ['--depth', '1', '--single-branch']
+        if strategy in ('blobless', 'sparse') or not profile.full:
+            # Blobs outside the profile are then never downloaded
+            command += ['--filter=blob:none']
+        if not profile.full:
+            command += ['--sparse']
+        
+        # git refuses to clone into a non-empty directory, but an empty one is fine
+        started = time.monotonic()
+        self.run_command(command + [repo_url, str(destination)])
+        if not profile.full:
+            self.apply_sparse_checkout(destination, profile)
+        self.record_transfer(name, 'clone', strategy, started, 0, destination)
+    
+    def apply_sparse_checkout(self, destination: Path, profile: InstallProfile):
+        """Limit a clone's working tree to an install profile"""
+        if profile.full:
+            if (destination / '.git' / 'info' / 'sparse-checkout').exists():
+                self.run_command(['git', 'sparse-checkout', 'disable'], cwd=destination)
+            return
+        self.run_command(['git', 'sparse-checkout', 'set', '--no-cone', '--'] + profile.patterns,
+                         cwd=destination)
+        self.log(f"ℹ️ Checking out the '{profile.name}' profile of {destination.name}")
+    
+    def update_repo(self, destination: Path, name: str):
+        """Bring an existing clone up to date with a fetch and hard reset"""
+        strategy = CONFIG['clone_strategy']
+        depth = [] if strategy in ('full', 'blobless') else ['--depth', '1']
+        state = self.install_state()
+        
+        # A clean checkout of the remote head needs no fetch at all
+        current = self.git_revision(destination)
+        if current and current == self.repo_revision(name):
+            remote = self.run_command(['git', 'ls-remote', 'origin',
+                                       f"refs/heads/{CONFIG['repo_branch']}"],
+                                      cwd=destination).stdout.split()
+            status = self.run_command(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                      cwd=destination).stdout.strip()
+            if remote and remote[0] == current and not status:
+                self.log(f"✅ {name} repository already at {current[:12]}, skipping update")
+                self.skip_step()
+                return
+        
+        state.record('fetch', name, None)
+        self.apply_sparse_checkout(destination, self.active_profile())
+        started = time.monotonic()
+        objects_before = directory_size(destination / '.git' / 'objects')
+        self.run_command(['git', 'fetch'] + depth + ['origin', CONFIG['repo_branch']],
+                         cwd=destination)
+        self.run_command(['git', 'reset', '--hard', 'FETCH_HEAD'], cwd=destination)
+        self.record_transfer(name, 'update', strategy, started, objects_before, destination)
+        state.record('fetch', name, {'source': 'git', 'profile': self.install_profile,
+                                     'revision': self.git_revision(destination)})
+    
+    def git_revision(self, destination: Path) -> Optional[str]:
+        """Commit SHA checked out in a clone"""
+        try:
+            return self.run_command(['git', 'rev-parse', 'HEAD'], cwd=destination).stdout.strip()
+        except subprocess.CalledProcessError:
+            return None
+    
+    def record_transfer(self, name: str, operation: str, strategy: str, started: float,
+                        objects_before: int, destination: Path):
+        """Record how long a git transfer took and how many object bytes it brought in"""
+        elapsed = time.monotonic() - started
+        transferred = max(0, directory_size(destination / '.git' / 'objects') - objects_before)
+        self.clone_stats[name] = {'operation': operation, 'strategy': strategy,
+                                  'seconds': round(elapsed, 2), 'bytes': transferred}
+        verb = 'Cloned' if operation == 'clone' else 'Updated'
+        self.log(f"✅ {verb} {name} repository ({strategy}: "
+                 f"{transferred / (1024 ** 2):.1f} MB in {elapsed:.1f}s)")
     
     def install_dependencies(self, directory: Path, name: str):
         """Install npm dependencies"""
         self.log(f"Installing {name} dependencies...")
         
+        state = self.install_state()
+        lockfile = self.find_lockfile(directory)
+        _, node_version = self.check_command('node')
+        fingerprint = {'lock_hash': file_sha256(lockfile) if lockfile else None,
+                       'node_version': node_version}
+        
         try:
-            # Install dependencies
-            subprocess.run(['npm', 'install'], cwd=directory, check=True, 
-                         capture_output=True, text=True)
-            self.log(f"✅ {name} dependencies installed")
-            
-            # Try to build
-            try:
-                subprocess.run(['npm', 'run', 'build'], cwd=directory, check=True, 
-                             capture_output=True, text=True)
-                self.log(f"✅ {name} built successfully")
-            except subprocess.CalledProcessError:
-                self.log(f"⚠️ {name} build failed (not critical)", 'WARNING')
+            if lockfile and self.step_unchanged('dependencies', name, fingerprint,
+                                                directory / 'node_modules'):
+                self.log(f"✅ {name} dependencies unchanged since last install ({lockfile.name}), skipping")
+                self.skip_step()
+            else:
+                # Forget the previous install until this one succeeds
+                state.record('dependencies', name, None)
+                
+                store = self.package_store() if self.shared_store and lockfile else None
+                key = PackageStore.tree_key(fingerprint['lock_hash'], node_version) if store else None
+                if store and self.link_dependencies(store, key, directory, name):
+                    state.record('dependencies', name, fingerprint)
+                    self.progress.complete(f"{name} dependencies", f"{name} dependencies installed")
+                    return
+                
+                # npm ci is faster and reproducible whenever a lockfile pins the tree
+                install_command = ['npm', 'ci'] if lockfile else ['npm', 'install']
+                install_command += ['--cache', str(self.npm_cache_dir())]
+                if self.bundle:
+                    # Offline bundles ship a packed npm cache; never touch the network
+                    install_command.append('--offline')
+                else:
+                    install_command.append('--prefer-offline')
+                self.run_command(install_command, cwd=directory, env=self.node_environment())
+                
+                # npm install may have just written the lockfile
+                lockfile = self.find_lockfile(directory)
+                if lockfile:
+                    fingerprint['lock_hash'] = file_sha256(lockfile)
+                    state.record('dependencies', name, fingerprint)
+                self.log(f"✅ {name} dependencies installed")
+                if store:
+                    self.store_dependencies(store, key, directory, name)
+            self.progress.complete(f"{name} dependencies", f"{name} dependencies installed")
                 
         except subprocess.CalledProcessError as e:
             self.log(f"❌ Failed to install {name} dependencies: {e}", 'ERROR')
             raise
     
+    def package_store(self) -> PackageStore:
+        """node_modules store shared by every installation using this cache directory"""
+        return PackageStore(self.cache_dir / 'store', CONFIG['store_max_mb'] * 1024 * 1024)
+    
+    def link_dependencies(self, store: PackageStore, key: str, directory: Path, name: str) -> bool:
+        """Materialize node_modules from the shared store instead of running npm
+        
+        Returns False if the store has no complete tree for key.
+        """
+        with store.lock, store.locked():
+            entries = store.lookup(key)
+            if entries is None:
+                return False
+            node_modules = directory / 'node_modules'
+            if node_modules.exists():
+                shutil.rmtree(node_modules)
+            linked, copied = store.materialize(entries, node_modules)
+            store.touch(key)
+        self.log(f"♻️ {name} dependencies linked from the shared store "
+                 f"({linked} hardlinked, {copied} copied)")
+        return True
+    
+    def store_dependencies(self, store: PackageStore, key: str, directory: Path, name: str):
+        """Add a freshly installed node_modules to the shared store, then trim it"""
+        try:
+            with store.lock, store.locked():
+                files, added = store.ingest(key, directory / 'node_modules', CONFIG['store_exclude_dirs'])
+                evicted, freed = store.trim(keep=key)
+            self.log(f"✅ {name} dependencies added to the shared store ({files} files, {added} new)")
+            if evicted or freed:
+                self.log(f"♻️ Shared store trimmed: {evicted} trees evicted, "
+                         f"{freed / 1024 / 1024:.1f} MB freed")
+        except OSError as e:
+            # The install itself succeeded; only sharing it failed
+            self.log(f"⚠️ Could not add {name} dependencies to the shared store: {e}", 'WARNING')
+    
+    def build_project(self, directory: Path, name: str):
+        """Run a project's build script, unless its inputs are unchanged"""
+        state = self.install_state()
+        if name in self.prebuilt:
+            self.log(f"✅ {name} build output provided by bundle")
+            state.record('build_output', name, self.build_output(directory))
+            self.skip_step()
+            self.progress.complete(f"{name} build")
+            return
+        
+        build_inputs = self.build_inputs(directory, name)
+        outputs = [directory / output for output in CONFIG['build_output_dirs']]
+        if (build_inputs['revision'] and build_inputs['lock_hash'] and
+                self.step_unchanged('build', name, build_inputs, *outputs)):
+            self.log(f"✅ {name} sources unchanged since last build, skipping")
+            self.skip_step()
+            self.progress.complete(f"{name} build", f"{name} build finished")
+            return
+        
+        # Try to build
+        state.record('build', name, None)
+        state.record('build_output', name, None)
+        try:
+            self.run_command(['npm', 'run', 'build'], cwd=directory, env=self.node_environment())
+            state.record('build', name, build_inputs)
+            self.log(f"✅ {name} built successfully")
+        except subprocess.CalledProcessError:
+            self.log(f"⚠️ {name} build failed (not critical)", 'WARNING')
+        state.record('build_output', name, self.build_output(directory))
+        self.progress.complete(f"{name} build", f"{name} build finished")
+    
+    def build_inputs(self, directory: Path, name: str) -> dict:
+        """What a build depends on: the sources, the dependency tree and Node"""
+        lockfile = self.find_lockfile(directory)
+        _, node_version = self.check_command('node')
+        return {'lock_hash': file_sha256(lockfile) if lockfile else None,
+                'node_version': node_version, 'revision': self.repo_revision(name),
+                'profile': self.install_profile}
+    
+    def build_output(self, directory: Path) -> Optional[dict]:
+        """The servable build output of a project (a directory with an index.html)"""
+        for output in CONFIG['build_output_dirs']:
+            index = directory / output / 'index.html'
+            if index.is_file():
+                files = [path for path in (directory / output).rglob('*') if path.is_file()]
+                return {'dir': output, 'files': len(files),
+                        'bytes': sum(path.stat().st_size for path in files)}
+        return None
+    
+    def npm_scripts(self, directory: Path) -> Dict[str, str]:
+        """The scripts section of a project's package.json"""
+        try:
+            package = json.loads((directory / 'package.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        scripts = package.get('scripts') if isinstance(package, dict) else None
+        return scripts if isinstance(scripts, dict) else {}
+    
+    def warm_up(self, directory: Path, name: str):
+        """Start the dev server once so its dependency pre-bundling is cached
+        
+        The server is stopped as soon as it has served the first page; the
+        launchers' dev mode then starts from warm caches. Failures only warn.
+        """
+        if not CONFIG['prime_dev_server'] or 'dev' not in self.npm_scripts(directory):
+            self.skip_step()
+            self.progress.complete(f"{name} warmup")
+            return
+        inputs = self.build_inputs(directory, name)
+        if (inputs['revision'] and inputs['lock_hash'] and
+                self.step_unchanged('warmup', name, inputs, directory / 'node_modules')):
+            self.log(f"✅ {name} dev server caches already primed, skipping")
+            self.skip_step()
+            self.progress.complete(f"{name} warmup")
+            return
+        
+        self.install_state().record('warmup', name, None)
+        self.log(f"Priming {name} dev server caches...")
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/"
+        kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == 'nt' \
+            else {'start_new_session': True}
+        started = time.monotonic()
+        try:
+            process = subprocess.Popen(['npm', 'run', 'dev', '--', '--port', str(port), '--strictPort'],
+                                       cwd=directory, env=self.node_environment(),
+                                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL, **kwargs)
+        except OSError as e:
+            self.log(f"⚠️ Could not start the {name} dev server: {e}", 'WARNING')
+            self.progress.complete(f"{name} warmup")
+            return
+        with self.children_lock:
+            self.children.add(process)
+        try:
+            ready = False
+            deadline = started + CONFIG['warmup_timeout_seconds']
+            while time.monotonic() < deadline and process.poll() is None:
+                self.check_cancelled()
+                # The first page request makes the server crawl and pre-bundle imports
+                if http_ready(url):
+                    ready = True
+                    break
+                time.sleep(0.25)
+            metadata = directory / 'node_modules' / '.vite' / 'deps' / '_metadata.json'
+            if ready and (directory / 'node_modules' / 'vite').is_dir():
+                # Vite finishes pre-bundling in the background after that request
+                while not metadata.exists() and time.monotonic() < deadline and process.poll() is None:
+                    time.sleep(0.25)
+        finally:
+            terminate_process_tree(process)
+            process.wait()
+            with self.children_lock:
+                self.children.discard(process)
+        
+        if ready:
+            self.install_state().record('warmup', name, inputs)
+            self.log(f"✅ {name} dev server caches primed in {time.monotonic() - started:.1f}s")
+        else:
+            self.log(f"⚠️ {name} dev server did not answer within "
+                     f"{CONFIG['warmup_timeout_seconds']}s, caches not primed", 'WARNING')
+        self.progress.complete(f"{name} warmup")
+    
+    def find_lockfile(self, directory: Path) -> Optional[Path]:
+        """Return the npm lockfile pinning a project's dependency tree, if any"""
+        for lock_name in ('npm-shrinkwrap.json', 'package-lock.json'):
+            if (directory / lock_name).is_file():
+                return directory / lock_name
+        return None
+    
+    def install_from_bundle(self, bundle: Path, install_core: bool = False):
+        """Install the demo (and optionally core) from an offline bundle"""
+        self.log(f"Installing from offline bundle: {bundle}")
+        components = {'demo': self.demo_dir, 'npm-cache': self.npm_cache_dir()}
+        if install_core:
+            components['core'] = self.core_dir
+        
+        # Extract into staging directories so a bad bundle never replaces a working tree
+        staging = {}
+        for component, destination in components.items():
+            staging[component] = destination.parent / f".{destination.name}.staging"
+            if staging[component].exists():
+                shutil.rmtree(staging[component])
+            staging[component].mkdir(parents=True)
+        
+        try:
+            manifest = self.extract_bundle(bundle, staging)
+            if install_core and 'core' not in manifest.get('components', []):
+                self.log("⚠️ Bundle does not contain the core repository, skipping it", 'WARNING')
+                shutil.rmtree(staging.pop('core'))
+            for component, staging_dir in staging.items():
+                destination = components[component]
+                if component == 'npm-cache' and destination.exists():
+                    # npm's cache is content-addressed, so bundle entries merge into it
+                    shutil.copytree(staging_dir, destination, dirs_exist_ok=True)
+                    shutil.rmtree(staging_dir)
+                    continue
+                self.swap_in(staging_dir, destination, component.capitalize())
+        except BaseException:
+            for staging_dir in staging.values():
+                if staging_dir.exists():
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        
+        # Bundled trees are identified by the manifest's file digests
+        revision = hashlib.sha256(json.dumps(manifest['files'], sort_keys=True).encode()).hexdigest()
+        state = self.install_state()
+        for component in staging:
+            if component != 'npm-cache':
+                state.record('fetch', component.capitalize(), {'source': 'bundle', 'revision': revision})
+        self.prebuilt = {component.capitalize() for component in manifest.get('prebuilt', [])}
+        self.log("✅ Bundle verified and extracted")
+        self.progress.complete('bundle', "Bundle extracted")
+    
+    def extract_bundle(self, bundle: Path, staging: Dict[str, Path]) -> dict:
+        """Extract a bundle into per-component staging dirs, verifying every file as it is written"""
+        if bundle.suffix == '.zst':
+            raise ValueError("Zstandard bundles need an external tool; use .zip or .tar.xz bundles")
+        if zipfile.is_zipfile(bundle):
+            return self.extract_bundle_zip(bundle, staging)
+        if tarfile.is_tarfile(bundle):
+            return self.extract_bundle_tar(bundle, staging)
+        raise ValueError(f"Unrecognised bundle format: {bundle}")
+    
+    def bundle_target(self, name: str, staging: Dict[str, Path]) -> Optional[Path]:
+        """Map a bundle member to its staging path, or None if it is not wanted"""
+        component = name.replace('\\', '/').split('/', 1)[0]
+        if component not in staging:
+            return None
+        return archive_member_path(staging[component], name, strip_components=1)
+    
+    def verify_bundle_file(self, name: str, digest: str, manifest: dict):
+        if manifest['files'].get(name) != digest:
+            raise ValueError(f"Bundle integrity check failed for {name}")
+    
+    def extract_bundle_zip(self, bundle: Path, staging: Dict[str, Path]) -> dict:
+        with zipfile.ZipFile(bundle) as archive:
+            manifest = json.loads(archive.read('manifest.json'))
+            members = [member for member in archive.infolist()
+                       if not member.is_dir() and member.filename != 'manifest.json']
+        self.check_bundle_manifest(manifest, [member.filename for member in members])
+        
+        # Pre-create directories once, then spread members across workers
+        wanted = [(member, self.bundle_target(member.filename, staging)) for member in members]
+        wanted = [(member, path) for member, path in wanted if path is not None]
+        for directory in {path.parent for _, path in wanted}:
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        workers = self.tuning['extract_workers']
+        batches = [wanted[i::workers] for i in range(workers)]
+        done = [0]
+        lock = threading.Lock()
+        
+        def extract_batch(batch):
+            with zipfile.ZipFile(bundle) as archive:
+                for member, path in batch:
+                    self.check_cancelled()
+                    with archive.open(member) as source:
+                        digest = copy_and_hash(source, path)
+                    self.verify_bundle_file(member.filename, digest, manifest)
+                    mode = member.external_attr >> 16
+                    if os.name != 'nt' and mode & 0o111:
+                        path.chmod(mode & 0o777)
+                    with lock:
+                        done[0] += 1
+                        fraction = done[0] / len(wanted)
+                    self.progress.update('bundle', fraction, "Extracting bundle...")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(extract_batch, batch) for batch in batches if batch]
+            for future in futures:
+                future.result()
+        self.metrics.add(self.current_step(), 'bytes_written',
+                         sum(member.file_size for member, _ in wanted))
+        return manifest
+    
+    def extract_bundle_tar(self, bundle: Path, staging: Dict[str, Path]) -> dict:
+        # Compressed tars are a single stream: verify while extracting sequentially
+        manifest = None
+        seen = []
+        with tarfile.open(bundle, 'r|*') as archive:
+            for member in archive:
+                self.check_cancelled()
+                if member.name == 'manifest.json':
+                    manifest = json.loads(archive.extractfile(member).read())
+                    continue
+                if manifest is None:
+                    raise ValueError("Bundle manifest must be the first member of a tar bundle")
+                if not member.isfile():
+                    continue
+                seen.append(member.name)
+                path = self.bundle_target(member.name, staging)
+                if path is None:
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                digest = copy_and_hash(archive.extractfile(member), path)
+                self.metrics.add(self.current_step(), 'bytes_written', member.size)
+                self.verify_bundle_file(member.name, digest, manifest)
+                self.progress.update('bundle', len(seen) / max(1, len(manifest['files'])),
+                                     "Extracting bundle...")
+                if os.name != 'nt' and member.mode & 0o111:
+                    path.chmod(member.mode & 0o777)
+        if manifest is None:
+            raise ValueError("Bundle has no manifest.json")
+        self.check_bundle_manifest(manifest, seen)
+        return manifest
+    
+    def check_bundle_manifest(self, manifest: dict, names):
+        """Reject bundles from another format or whose contents differ from the manifest"""
+        if manifest.get('format') != CONFIG['bundle_format']:
+            raise ValueError(f"Unsupported bundle format: {manifest.get('format')}")
+        if set(names) != set(manifest.get('files', {})):
+            raise ValueError("Bundle contents do not match its manifest")
+    
+    def create_bundle(self, output: Path) -> bool:
+        """Build an offline bundle from an existing installation"""
+        if not (self.demo_dir / 'package.json').exists():
+            self.log(f"❌ No demo installation found at {self.demo_dir}", 'ERROR')
+            return False
+        
+        sources = {'demo': self.demo_dir}
+        if (self.core_dir / 'package.json').exists():
+            sources['core'] = self.core_dir
+        npm_cache = self.npm_cache_dir()
+        if not npm_cache.exists():
+            available, cache_path = self.check_command_output(['npm', 'config', 'get', 'cache'])
+            npm_cache = Path(cache_path) if available else None
+        if npm_cache and npm_cache.exists():
+            sources['npm-cache'] = npm_cache
+        else:
+            self.log("⚠️ No npm cache found; the bundle will need network access for npm", 'WARNING')
+        
+        self.log(f"Creating offline bundle {output}...")
+        files = {}
+        for component, root in sources.items():
+            for directory, dirs, names in os.walk(root):
+                if component != 'npm-cache':
+                    dirs[:] = [d for d in dirs if d not in CONFIG['bundle_exclude_dirs']]
+                for file_name in names:
+                    path = Path(directory) / file_name
+                    if path.is_symlink() or not path.is_file():
+                        continue
+                    files[f"{component}/{path.relative_to(root).as_posix()}"] = path
+        
+        manifest = {
+            'format': CONFIG['bundle_format'],
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'components': sorted(sources),
+            'prebuilt': sorted(component for component, root in sources.items()
+                               if component != 'npm-cache' and
+                               any((root / d).is_dir() for d in CONFIG['build_output_dirs'])),
+            'files': {name: file_sha256(path) for name, path in sorted(files.items())}
+        }
+        manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+        
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if output.suffix == '.zip':
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('manifest.json', manifest_bytes)
+                for name, path in sorted(files.items()):
+                    archive.write(path, name)
+        elif output.suffix == '.zst':
+            self.log("❌ Zstandard bundles are not supported; use .zip or .tar.xz", 'ERROR')
+            return False
+        else:
+            mode = {'.gz': 'w:gz', '.tgz': 'w:gz', '.xz': 'w:xz', '.bz2': 'w:bz2'}.get(output.suffix, 'w')
+            with tarfile.open(output, mode) as archive:
+                # The manifest goes first so extraction can verify while streaming
+                info = tarfile.TarInfo('manifest.json')
+                info.size = len(manifest_bytes)
+                info.mtime = int(time.time())
+                archive.addfile(info, io.BytesIO(manifest_bytes))
+                for name, path in sorted(files.items()):
+                    archive.add(path, name, recursive=False)
+        
+        self.log(f"✅ Bundle created: {output} ({len(files)} files, components: {', '.join(manifest['components'])})")
+        return True
+    
+    def check_command_output(self, command) -> Tuple[bool, str]:
+        """Run a short command and return its trimmed output"""
+        try:
+            result = subprocess.run(command, capture_output=True, text=True,
+                                    timeout=CONFIG['probe_timeout'])
+            return result.returncode == 0, result.stdout.strip()
+        except (subprocess.TimeoutExpired, OSError):
+            return False, ""
+    
     def setup_environment(self):
         """Setup environment files"""
         self.log("Setting up environment...")
@@ -237,19 +3214,73 @@ class AnarQQInstaller:
             self.log("✅ Environment file created")
     
     def create_launchers(self):
-        """Create launcher scripts"""
+        """Create launcher scripts
+        
+        start-demo serves the prebuilt output when the build produced one and
+        runs the dev server otherwise (or with --dev). Either way it polls the
+        server until it answers, then opens the browser.
+        """
+        build_output = self.install_state().get('build_output', 'Demo')
+        output_dir = build_output['dir'] if build_output else CONFIG['build_output_dirs'][0]
+        has_preview = 'preview' in self.npm_scripts(self.demo_dir)
+        # Launchers embed the demo path, how to serve it and the platform
+        inputs = {'demo_dir': str(self.demo_dir), 'platform': os.name, 'output_dir': output_dir,
+                  'preview_script': has_preview, 'python': sys.executable,
+                  'version': CONFIG['launcher_version']}
+        scripts = ['start-demo.bat', 'stop-services.bat'] if os.name == 'nt' else \
+            ['start-demo.sh', 'stop-services.sh']
+        if self.step_unchanged('launchers', 'scripts', inputs,
+                               *(self.install_dir / script for script in scripts)):
+            self.log("✅ Launcher scripts up to date, skipping")
+            self.skip_step()
+            return
+        self.install_state().record('launchers', 'scripts', None)
         self.log("Creating launcher scripts...")
+        timeout = CONFIG['launcher_ready_timeout']
         
         # Cross-platform launcher scripts
         if os.name == 'nt':  # Windows
+            if has_preview:
+                preview = 'npm run preview -- --port %PORT% --strictPort'
+            else:
+                preview = f'"{sys.executable}" -m http.server %PORT% --bind 127.0.0.1 --directory "{output_dir}"'
+            probe = (f"$deadline = (Get-Date).AddSeconds({timeout}); "
+                     "while ((Get-Date) -lt $deadline) { "
+                     "try { Invoke-WebRequest -UseBasicParsing -TimeoutSec 2 'http://localhost:%PORT%/' | Out-Null; exit 0 } "
+                     "catch { if ($_.Exception.Response) { exit 0 } }; "
+                     "Start-Sleep -Milliseconds 250 }; exit 1")
+            
             # Start demo script
             start_script = self.install_dir / 'start-demo.bat'
             with open(start_script, 'w') as f:
                 f.write('@echo off\n')
-                f.write('echo 🚀 Starting AnarQ&Q Demo...\n')
+                f.write('setlocal\n')
+                f.write('rem Usage: start-demo.bat [--dev]  (ANARQQ_PORT sets the port, '
+                        'ANARQQ_NO_BROWSER=1 skips the browser)\n')
+                f.write('echo 🚀 Starting AnarQ^&Q Demo...\n')
                 f.write(f'cd /d "{self.demo_dir}"\n')
-                f.write('npm run dev\n')
-                f.write('pause\n')
+                f.write('set "MODE=preview"\n')
+                f.write('if /i "%~1"=="--dev" set "MODE=dev"\n')
+                f.write(f'if not exist "{output_dir}\\index.html" set "MODE=dev"\n')
+                f.write(f'if "%MODE%"=="dev" (set "PORT={CONFIG["dev_port"]}") '
+                        f'else (set "PORT={CONFIG["preview_port"]}")\n')
+                f.write('if defined ANARQQ_PORT set "PORT=%ANARQQ_PORT%"\n')
+                f.write('if "%MODE%"=="dev" (\n')
+                f.write('    start "AnarQQ Demo" /b npm run dev -- --port %PORT% --strictPort\n')
+                f.write(') else (\n')
+                f.write(f'    start "AnarQQ Demo" /b {preview}\n')
+                f.write(')\n')
+                f.write('rem Wait for the server to answer instead of a fixed delay\n')
+                f.write(f'powershell -NoProfile -Command "{probe}"\n')
+                f.write('if errorlevel 1 (\n')
+                f.write(f'    echo ❌ The demo did not become ready within {timeout}s\n')
+                f.write('    pause\n')
+                f.write('    exit /b 1\n')
+                f.write(')\n')
+                f.write('echo ✅ Demo ready at http://localhost:%PORT%/ [%MODE% mode]\n')
+                f.write('if not defined ANARQQ_NO_BROWSER start "" "http://localhost:%PORT%/"\n')
+                f.write('echo Close this window to stop the demo\n')
+                f.write('pause >nul\n')
             
             # Stop script
             stop_script = self.install_dir / 'stop-services.bat'
@@ -261,13 +3292,66 @@ class AnarQQInstaller:
                 f.write('echo Services stopped\n')
                 f.write('pause\n')
         else:  # Unix-like
+            if has_preview:
+                preview = 'npm run preview -- --port "$PORT" --strictPort'
+            else:
+                preview = f'"{sys.executable}" -m http.server "$PORT" --bind 127.0.0.1 --directory "{output_dir}"'
+            
             # Start demo script
             start_script = self.install_dir / 'start-demo.sh'
             with open(start_script, 'w') as f:
                 f.write('#!/bin/bash\n')
+                f.write('# Usage: start-demo.sh [--dev]  (ANARQQ_PORT sets the port, '
+                        'ANARQQ_NO_BROWSER=1 skips the browser)\n')
                 f.write('echo "🚀 Starting AnarQ&Q Demo..."\n')
-                f.write(f'cd "{self.demo_dir}"\n')
-                f.write('npm run dev\n')
+                f.write(f'cd "{self.demo_dir}" || exit 1\n')
+                f.write('\n')
+                f.write('# The server gets its own process group so stopping it stops its children\n')
+                f.write('set -m\n')
+                f.write(f'if [ "$1" = "--dev" ] || [ ! -f "{output_dir}/index.html" ]; then\n')
+                f.write('    MODE=dev\n')
+                f.write(f'    PORT="${{ANARQQ_PORT:-{CONFIG["dev_port"]}}}"\n')
+                f.write('    npm run dev -- --port "$PORT" --strictPort &\n')
+                f.write('else\n')
+                f.write('    MODE=preview\n')
+                f.write(f'    PORT="${{ANARQQ_PORT:-{CONFIG["preview_port"]}}}"\n')
+                f.write(f'    {preview} &\n')
+                f.write('fi\n')
+                f.write('SERVER=$!\n')
+                f.write('trap \'kill -- -$SERVER 2>/dev/null\' EXIT\n')
+                f.write('trap \'exit 130\' INT TERM\n')
+                f.write('URL="http://localhost:$PORT/"\n')
+                f.write('\n')
+                f.write('ready() {\n')
+                f.write('    if command -v curl >/dev/null 2>&1; then\n')
+                f.write('        curl -s -o /dev/null --max-time 2 "$URL"\n')
+                f.write('    else\n')
+                f.write('        (exec 3<>"/dev/tcp/localhost/$PORT") 2>/dev/null\n')
+                f.write('    fi\n')
+                f.write('}\n')
+                f.write('\n')
+                f.write('# Wait for the server to answer instead of a fixed delay\n')
+                f.write(f'for _ in $(seq 1 {timeout * 4}); do\n')
+                f.write('    ready && break\n')
+                f.write('    if ! kill -0 "$SERVER" 2>/dev/null; then\n')
+                f.write('        echo "❌ The demo server stopped before it was ready"\n')
+                f.write('        exit 1\n')
+                f.write('    fi\n')
+                f.write('    sleep 0.25\n')
+                f.write('done\n')
+                f.write('if ! ready; then\n')
+                f.write(f'    echo "❌ The demo did not become ready within {timeout}s"\n')
+                f.write('    exit 1\n')
+                f.write('fi\n')
+                f.write('echo "✅ Demo ready at $URL ($MODE mode)"\n')
+                f.write('if [ -z "$ANARQQ_NO_BROWSER" ]; then\n')
+                f.write('    if command -v xdg-open >/dev/null 2>&1; then\n')
+                f.write('        xdg-open "$URL" >/dev/null 2>&1 &\n')
+                f.write('    elif command -v open >/dev/null 2>&1; then\n')
+                f.write('        open "$URL"\n')
+                f.write('    fi\n')
+                f.write('fi\n')
+                f.write('wait "$SERVER"\n')
             start_script.chmod(0o755)
             
             # Stop script
@@ -282,73 +3366,134 @@ class AnarQQInstaller:
                 f.write('echo "Services stopped"\n')
             stop_script.chmod(0o755)
         
+        self.install_state().record('launchers', 'scripts', inputs)
         self.log("✅ Launcher scripts created")
     
     def install(self, install_core: bool = False) -> bool:
         """Main installation process"""
+        self.owner_thread = threading.get_ident()
+        self.cancel_event.clear()
+        self.metrics.reset()
+        self.swapped.clear()
+        profilers = self.start_profiling() if self.profile else None
+        success = False
         try:
+            steps = self.install_steps(install_core)
+            self.progress.reset(self.progress_plan(steps))
             self.update_progress(0, "Starting installation...")
             
-            # Check requirements
-            if not self.check_system_requirements():
-                self.log("❌ System requirements not met", 'ERROR')
-                return False
-            self.update_progress(10, "System requirements checked")
-            
-            # Setup directories
-            self.setup_directories()
-            self.update_progress(20, "Directories created")
-            
-            # Download demo repository
-            self.clone_or_download_repo(
-                CONFIG['demo_repo'], 
-                CONFIG['demo_zip'], 
-                self.demo_dir, 
-                'Demo'
-            )
-            self.update_progress(40, "Demo repository downloaded")
-            
-            # Download core repository if requested
-            if install_core:
-                self.clone_or_download_repo(
-                    CONFIG['core_repo'], 
-                    CONFIG['core_zip'], 
-                    self.core_dir, 
-                    'Core'
-                )
-                self.update_progress(60, "Core repository downloaded")
-            else:
-                self.update_progress(60, "Skipping core repository")
-            
-            # Install demo dependencies
-            self.install_dependencies(self.demo_dir, 'Demo')
-            self.update_progress(80, "Dependencies installed")
-            
-            # Setup environment
-            self.setup_environment()
-            self.update_progress(90, "Environment configured")
-            
-            # Create launchers
-            self.create_launchers()
+            # Independent steps run concurrently; each starts once its inputs exist
+            self.run_steps(steps)
             self.update_progress(100, "Installation completed")
             
             self.log("🎉 Installation completed successfully!")
+            success = True
             return True
             
         except Exception as e:
-            self.log(f"❌ Installation failed: {e}", 'ERROR')
+            if self.cancel_event.is_set():
+                self.log("🛑 Installation cancelled", 'WARNING')
+            else:
+                self.log(f"❌ Installation failed: {e}", 'ERROR')
             return False
+        
+        finally:
+            self.set_step(None)
+            self.finish_updates(success)
+            self.http.close()
+            if profilers is not None:
+                self.stop_profiling(profilers)
+            self.write_metrics(install_core, success)
+            self.logger.flush()
+    
+    def write_metrics(self, install_core: bool, success: bool):
+        """Write per-phase timings and resource usage next to install.log"""
+        if not self.install_dir.exists():
+            return
+        report = {'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'success': success,
+                  'install_core': install_core, 'bundle': bool(self.bundle),
+                  'platform': sys.platform, 'python': sys.version.split()[0]}
+        report.update(self.metrics.report())
+        report['transfers'] = self.clone_stats
+        # A skipped step takes no time, so keep its last real timing for progress_plan
+        step_seconds = self.previous_step_seconds()
+        if success:
+            for name, phase in report['phases'].items():
+                if not phase['skipped']:
+                    step_seconds[name] = phase['wall_seconds']
+                else:
+                    step_seconds.setdefault(name, phase['wall_seconds'])
+        report['step_seconds'] = step_seconds
+        try:
+            temp_file = self.metrics_file.with_name(self.metrics_file.name + '.tmp')
+            temp_file.write_text(json.dumps(report, indent=2), encoding='utf-8')
+            os.replace(temp_file, self.metrics_file)
+            self.log(f"📊 Install metrics written to {self.metrics_file}")
+        except OSError as e:
+            self.log(f"⚠️ Could not write install metrics: {e}", 'WARNING')
+    
+    def start_profiling(self) -> list:
+        """Profile this thread and every thread started while installing"""
+        if sys.version_info >= (3, 12):
+            # cProfile runs on sys.monitoring there, which sees every thread,
+            # and a second active profiler would fail to start
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return [profiler]
+        
+        profilers = []
+        
+        def profile_thread(*_):
+            # Replaces itself with a real profiler on each new thread's first
+            # call; the log flusher is left alone so no profile is still being
+            # written to when the stats are merged (pool workers are daemon
+            # threads before Python 3.9, so daemon status cannot tell them apart)
+            if threading.current_thread() is self.logger.flusher:
+                sys.setprofile(None)
+                return
+            profiler = cProfile.Profile()
+            profilers.append(profiler)
+            profiler.enable()
+        
+        threading.setprofile(profile_thread)
+        profile_thread()
+        return profilers
+    
+    def stop_profiling(self, profilers: list):
+        """Merge the per-thread profiles into one pstats dump"""
+        threading.setprofile(None)
+        profilers[0].disable()
+        # A thread that never ran Python code leaves an empty profile behind
+        stats = pstats.Stats(*(profiler for profiler in profilers if profiler.getstats()))
+        try:
+            stats.dump_stats(self.profile_file)
+            self.log(f"📊 Python profile written to {self.profile_file}")
+        except OSError as e:
+            self.log(f"⚠️ Could not write profile: {e}", 'WARNING')
 
 class InstallerGUI:
-    def __init__(self):
-        self.installer = AnarQQInstaller()
-        self.installer.progress_callback = self.update_progress
-        self.installer.log_callback = self.add_log
+    def __init__(self, options: Optional[argparse.Namespace] = None):
+        self.installer = create_installer(options)
+        
+        # The installer runs on a worker thread; Tk is only touched from here,
+        # by draining this queue from the event loop
+        self.events = queue.Queue()
+        self.worker = None
+        self.log_sequence = 0
+        # Set when the last installation failed or was cancelled
+        self.failed = False
+        # Set when the window was closed while an installation was running
+        self.closing = False
+        self.installer.progress_callback = lambda value, message="": \
+            self.events.put(('progress', value, message))
+        # Log lines are read from the installer's in-memory ring instead
+        self.installer.echo = False
         
         self.root = tk.Tk()
         self.root.title("AnarQ&Q Ecosystem Demo Installer")
         self.root.geometry("800x600")
         self.root.resizable(True, True)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         self.setup_ui()
     
@@ -387,6 +3532,20 @@ class InstallerGUI:
                                     variable=self.install_core_var)
         core_check.grid(row=0, column=0, sticky=tk.W)
         
+        connections_frame = ttk.Frame(options_frame)
+        connections_frame.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Label(connections_frame, text="Download connections (0 = auto):").pack(side=tk.LEFT)
+        self.download_connections_var = tk.IntVar(value=self.installer.download_connections)
+        ttk.Spinbox(connections_frame, from_=0, to=16, width=5,
+                    textvariable=self.download_connections_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        profile_frame = ttk.Frame(options_frame)
+        profile_frame.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Label(profile_frame, text="Install profile:").pack(side=tk.LEFT)
+        self.install_profile_var = tk.StringVar(value=self.installer.install_profile)
+        ttk.Combobox(profile_frame, textvariable=self.install_profile_var, width=12, state='readonly',
+                     values=sorted(CONFIG['install_profiles'])).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Progress
         progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding="10")
         progress_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
@@ -415,7 +3574,11 @@ class InstallerGUI:
         self.install_btn = ttk.Button(button_frame, text="Install", command=self.start_installation)
         self.install_btn.pack(side=tk.LEFT, padx=(0, 10))
         
-        self.close_btn = ttk.Button(button_frame, text="Close", command=self.root.quit)
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel_installation,
+                                     state='disabled')
+        self.cancel_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.close_btn = ttk.Button(button_frame, text="Close", command=self.close)
         self.close_btn.pack(side=tk.LEFT)
     
     def browse_directory(self):
@@ -423,71 +3586,147 @@ class InstallerGUI:
         directory = filedialog.askdirectory(initialdir=self.install_dir_var.get())
         if directory:
             self.install_dir_var.set(directory)
-            self.installer.install_dir = Path(directory)
-            self.installer.demo_dir = self.installer.install_dir / 'demo'
-            self.installer.core_dir = self.installer.install_dir / 'core'
-            self.installer.log_file = self.installer.install_dir / 'install.log'
+            self.installer.set_install_dir(Path(directory))
     
     def update_progress(self, value: int, message: str = ""):
         """Update progress bar and label"""
         self.progress_var.set(value)
         if message:
             self.progress_label.config(text=message)
-        self.root.update_idletasks()
-    
-    def add_log(self, message: str):
-        """Add message to log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
     
     def start_installation(self):
-        """Start the installation process"""
+        """Start the installation process on a worker thread"""
         self.install_btn.config(state='disabled')
+        self.cancel_btn.config(state='normal')
+        
+        # Update installer paths
+        self.installer.set_install_dir(Path(self.install_dir_var.get()))
+        self.installer.download_connections = max(0, self.download_connections_var.get())
+        self.installer.install_profile = self.install_profile_var.get()
         
+        # Not a daemon: the installer's cleanup must finish before the process exits
+        self.worker = threading.Thread(target=self.run_installation,
+                                       args=(self.install_core_var.get(),))
+        self.worker.start()
+        self.root.after(CONFIG['gui_poll_interval_ms'], self.drain_events)
+    
+    def run_installation(self, install_core: bool):
+        """Worker thread body: run the installer and report the outcome"""
         try:
-            # Update installer paths
-            self.installer.install_dir = Path(self.install_dir_var.get())
-            self.installer.demo_dir = self.installer.install_dir / 'demo'
-            self.installer.core_dir = self.installer.install_dir / 'core'
-            self.installer.log_file = self.installer.install_dir / 'install.log'
-            
-            # Start installation
-            success = self.installer.install(self.install_core_var.get())
-            
-            if success:
-                messagebox.showinfo("Success", 
-                    f"Installation completed successfully!\n\n"
-                    f"Installation directory: {self.installer.install_dir}\n\n"
-                    f"Use the launcher scripts to start the demo.")
-            else:
-                messagebox.showerror("Error", "Installation failed. Check the log for details.")
-                
+            success = self.installer.install(install_core)
+            self.events.put(('done', success, None))
         except Exception as e:
-            messagebox.showerror("Error", f"Installation failed: {e}")
+            self.events.put(('done', False, str(e)))
+    
+    def drain_events(self):
+        """Apply queued installer events in one batch on the Tk thread"""
+        progress = None
+        outcome = None
+        for _ in range(CONFIG['gui_max_events_per_poll']):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'progress':
+                # Only the latest progress value matters
+                progress = event[1:]
+            else:
+                outcome = event[1:]
         
-        finally:
-            self.install_btn.config(state='normal')
+        self.log_sequence, lines = self.installer.logger.entries_since(self.log_sequence)
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_text.see(tk.END)
+        if progress is not None:
+            self.update_progress(*progress)
+        
+        # 'done' is always the worker's last event
+        if outcome is None:
+            self.root.after(CONFIG['gui_poll_interval_ms'], self.drain_events)
+        else:
+            self.finish_installation(*outcome)
+    
+    def finish_installation(self, success: bool, error: Optional[str]):
+        """Report the result once the worker thread has finished"""
+        self.worker = None
+        self.failed = not success
+        if self.closing:
+            self.root.quit()
+            return
+        self.install_btn.config(state='normal')
+        self.cancel_btn.config(state='disabled')
+        
+        if success:
+            messagebox.showinfo("Success", 
+                f"Installation completed successfully!\n\n"
+                f"Installation directory: {self.installer.install_dir}\n\n"
+                f"Use the launcher scripts to start the demo.")
+        elif self.installer.cancel_event.is_set():
+            messagebox.showwarning("Cancelled", "Installation cancelled.")
+        elif error:
+            messagebox.showerror("Error", f"Installation failed: {error}")
+        else:
+            messagebox.showerror("Error", "Installation failed. Check the log for details.")
+    
+    def cancel_installation(self):
+        """Cancel the running installation and terminate its child processes"""
+        self.cancel_btn.config(state='disabled')
+        self.progress_label.config(text="Cancelling...")
+        self.installer.cancel()
+    
+    def close(self):
+        """Close the window, cancelling any installation in progress
+        
+        A running installation is cancelled and the window stays open until
+        the worker reports back, so the installer still rolls back replaced
+        trees, closes its connections and flushes its log.
+        """
+        if self.worker is None:
+            self.root.quit()
+            return
+        if not self.closing:
+            self.closing = True
+            self.install_btn.config(state='disabled')
+            self.cancel_installation()
     
-    def run(self):
-        """Run the GUI"""
+    def run(self) -> bool:
+        """Run the GUI, returning False if the last installation failed"""
         self.root.mainloop()
+        return not self.failed
 
-def console_install():
+def create_installer(options: Optional[argparse.Namespace] = None) -> AnarQQInstaller:
+    """Create an installer configured from command line options"""
+    installer = AnarQQInstaller()
+    if options is not None:
+        installer.download_connections = options.download_connections
+        installer.step_budget = {'io': options.parallel_fetches, 'cpu': options.parallel_builds}
+        if options.cache_dir:
+            installer.cache_dir = Path(options.cache_dir).expanduser()
+        if options.install_dir:
+            installer.set_install_dir(Path(options.install_dir).expanduser())
+        if options.bundle:
+            installer.bundle = Path(options.bundle).expanduser()
+        if options.archive_manifest:
+            installer.load_archive_manifest(Path(options.archive_manifest).expanduser())
+        installer.logger.log_format = options.log_format
+        installer.verbose = options.verbose
+        installer.profile = options.profile
+        installer.install_profile = options.install_profile
+        installer.shared_store = options.shared_store or installer.shared_store
+    return installer
+
+def console_install(options: Optional[argparse.Namespace] = None):
     """Console-based installation"""
     print("🚀 AnarQ&Q Ecosystem Demo Installer (Console Mode)")
     print("=" * 50)
     
-    installer = AnarQQInstaller()
+    installer = create_installer(options)
     
     # Get installation directory
     default_dir = installer.install_dir
     install_dir = input(f"Installation directory [{default_dir}]: ").strip()
     if install_dir:
-        installer.install_dir = Path(install_dir)
-        installer.demo_dir = installer.install_dir / 'demo'
-        installer.core_dir = installer.install_dir / 'core'
-        installer.log_file = installer.install_dir / 'install.log'
+        installer.set_install_dir(Path(install_dir).expanduser())
     
     # Ask for core installation
     install_core = input("Install complete ecosystem (core repository)? (y/N): ").strip().lower() == 'y'
@@ -510,23 +3749,74 @@ def console_install():
     
     return True
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="AnarQ&Q Ecosystem Demo Installer")
+    parser.add_argument('--console', action='store_true',
+                        help="force console mode")
+    parser.add_argument('--download-connections', type=int, metavar='N',
+                        default=CONFIG['download_connections'],
+                        help="parallel connections per repository ZIP download (0: tune for this host)")
+    parser.add_argument('--parallel-fetches', type=int, metavar='N',
+                        default=CONFIG['step_budget']['io'],
+                        help="fetch and npm install steps run at once (0: tune for this host)")
+    parser.add_argument('--parallel-builds', type=int, metavar='N',
+                        default=CONFIG['step_budget']['cpu'],
+                        help="build steps run at once (0: tune for this host)")
+    parser.add_argument('--cache-dir', metavar='PATH',
+                        help="download cache directory (may be shared between machines)")
+    parser.add_argument('--install-dir', metavar='PATH',
+                        help="installation directory (default: ~/anarqq-ecosystem)")
+    parser.add_argument('--bundle', metavar='PATH',
+                        help="install offline from a bundle (.zip, .tar, .tar.gz or .tar.xz)")
+    parser.add_argument('--archive-manifest', metavar='PATH',
+                        help='JSON file pinning the SHA-256 of downloaded archives: {"archives": {URL: SHA256}}')
+    parser.add_argument('--shared-store', action='store_true',
+                        help="link node_modules from a content-addressed store in the cache directory")
+    parser.add_argument('--install-profile', choices=sorted(CONFIG['install_profiles']),
+                        default=CONFIG['install_profile'],
+                        help="parts of the repositories to install: minimal runtime, developer or full")
+    parser.add_argument('--profile', action='store_true',
+                        help="write a cProfile dump of the installer to install-profile.prof")
+    parser.add_argument('--verbose', action='store_true',
+                        help="echo git and npm output to the console as it is produced")
+    parser.add_argument('--log-format', choices=['text', 'jsonl'], default=CONFIG['log_format'],
+                        help="install.log format: plain text or JSON Lines with timestamps and step IDs")
+    parser.add_argument('--create-bundle', metavar='PATH',
+                        help="build an offline bundle from an existing installation and exit")
+    options = parser.parse_args(argv)
+    if options.download_connections < 0:
+        parser.error("--download-connections cannot be negative")
+    if options.parallel_fetches < 0 or options.parallel_builds < 0:
+        parser.error("--parallel-fetches and --parallel-builds cannot be negative")
+    if options.archive_manifest:
+        try:
+            json.loads(Path(options.archive_manifest).expanduser().read_text(encoding='utf-8'))['archives']
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            parser.error(f"--archive-manifest: cannot read pinned archives ({e})")
+    return options
+
 def main():
     """Main entry point"""
-    if len(sys.argv) > 1 and sys.argv[1] == '--console':
+    options = parse_args()
+    if options.create_bundle:
+        installer = create_installer(options)
+        return installer.create_bundle(Path(options.create_bundle).expanduser())
+    
+    if options.console:
         # Force console mode
-        return console_install()
+        return console_install(options)
     
     if GUI_AVAILABLE:
         try:
-            app = InstallerGUI()
-            app.run()
-            return True
+            app = InstallerGUI(options)
+            return app.run()
         except Exception as e:
             print(f"GUI failed: {e}")
             print("Falling back to console mode...")
-            return console_install()
+            return console_install(options)
     else:
-        return console_install()
+        return console_install(options)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Python Installer Benchmark
+Runs AnarQQInstaller.install from install-anarqq-demo.py against local stand-ins
+(an HTTP server serving synthetic demo/core ZIPs and shim git/npm/node
+executables with scripted latencies) and fails when a metric regresses past
+the stored baseline. The faults scenario downloads through a server that
+drops, throttles and mangles responses and fails unless every byte arrives;
+the extract scenario times streaming, in-process and process-pool extraction
+of an archive with many files.
+"""
+
+import argparse
+import hashlib
+import http.server
+import importlib.util
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INSTALLER = REPO_ROOT / 'install-anarqq-demo.py'
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'benchmark-python-installer-baseline.json'
+
+# Metrics below this many seconds are dominated by scheduling noise
+MIN_GATED_SECONDS = 0.05
+
+# Scenarios whose absolute timings swing with the host's load: they are
+# reported from the run with the median of the named metric, and only that
+# metric is compared with the baseline
+GATED_RATIOS = {'extract': 'parallel_to_serial_ratio'}
+# How far such a ratio may rise past the baseline: process-pool scheduling
+# moves it by up to a third between runs on a small host
+RATIO_THRESHOLD = 0.5
+
+# Faults ArchiveHandler can inject into GET responses, tried in this order;
+# the ranged ones only apply to requests with a Range header
+FAULTS = ('unavailable', 'drop', 'empty_range', 'ignore_ranges')
+RANGED_FAULTS = ('empty_range', 'ignore_ranges')
+
+SHIMS = {
+    'git': '''
+import os, sys, time
+if sys.argv[1:2] == ['--version']:
+    print('git version 2.40.0 (benchmark shim)')
+    sys.exit(0)
+time.sleep(float(os.environ.get('BENCH_GIT_SECONDS', '0')))
+print('fatal: the benchmark git shim has no network', file=sys.stderr)
+sys.exit(128)
+''',
+    'node': '''
+import sys
+print('v20.11.0')
+''',
+    'npm': '''
+import os, sys, time
+args = sys.argv[1:]
+if args[:1] == ['--version']:
+    print('10.2.4')
+elif args[:1] in (['ci'], ['install']):
+    time.sleep(float(os.environ.get('BENCH_NPM_SECONDS', '0')))
+    packages = int(os.environ.get('BENCH_NPM_PACKAGES', '0'))
+    shutil_root = os.path.join(os.getcwd(), 'node_modules')
+    for index in range(packages):
+        package = os.path.join(shutil_root, f'package-{index}')
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, 'index.js'), 'w') as f:
+            f.write(f'module.exports = {index};\\n' * 20)
+    print(f'added {packages} packages')
+elif args[:2] == ['run', 'build']:
+    time.sleep(float(os.environ.get('BENCH_BUILD_SECONDS', '0')))
+    os.makedirs('dist', exist_ok=True)
+    with open(os.path.join('dist', 'index.html'), 'w') as f:
+        f.write('<html></html>\\n')
+elif args[:2] == ['config', 'get']:
+    print(os.path.join(os.getcwd(), '.npm'))
+''',
+}
+
+
+class ArchiveHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the synthetic archives with ETags, byte ranges and optional throttling
+
+    faults maps each kind in FAULTS to how many more responses get it:
+    unavailable answers 503, drop closes the connection halfway through
+    the body, empty_range sends 206 headers and no body, and ignore_ranges
+    answers a ranged GET with the whole file while advertising byte ranges.
+    """
+    archives = {}
+    bandwidth = 0.0
+    faults = {}
+    faults_lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def take_fault(self, ranged: bool):
+        """Consume the next scheduled fault that applies to this request, if any"""
+        with self.faults_lock:
+            for fault in FAULTS:
+                if self.faults.get(fault) and (ranged or fault not in RANGED_FAULTS):
+                    self.faults[fault] -= 1
+                    return fault
+        return None
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond()
+
+    def respond(self, head=False):
+        data = self.archives.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        etag = f'"{len(data)}-{hash(data[:4096]) & 0xffffffff:x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        start, end = 0, len(data) - 1
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        ranged = bool(match) and self.headers.get('If-Range', etag) == etag
+        fault = None if head else self.take_fault(ranged)
+        if fault == 'unavailable':
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if ranged and fault != 'ignore_ranges':
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        if head:
+            return
+        if fault == 'empty_range':
+            self.close_connection = True
+            return
+
+        chunk = 64 * 1024
+        for offset in range(start, end + 1, chunk):
+            if fault == 'drop' and offset - start >= (end - start + 1) // 2:
+                self.close_connection = True
+                return
+            self.wfile.write(data[offset:min(offset + chunk, end + 1)])
+            if self.bandwidth:
+                time.sleep(chunk / self.bandwidth)
+
+
+class InstallerBenchmark:
+    def __init__(self, args):
+        self.args = args
+        self.workdir = Path(tempfile.mkdtemp(prefix='anarqq-bench-'))
+        self.server = None
+
+    def close(self):
+        if self.server:
+            self.server.shutdown()
+        if not self.args.keep:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def build_archive(self, name: str, files: int, size_mb: float, seed: int) -> bytes:
+        """Synthetic GitHub-style archive with a package.json, a lockfile and source files"""
+        rng = random.Random(seed)
+        words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+                 for _ in range(4096)]
+        per_file = max(64, int(size_mb * 1024 * 1024 / max(files, 1)))
+        prefix = f'anarqq-ecosystem-{name}-main'
+        path = self.workdir / f'{name}.zip'
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(f'{prefix}/package.json', json.dumps(
+                {'name': f'anarqq-{name}', 'version': '1.0.0', 'scripts': {'build': 'build'}}))
+            archive.writestr(f'{prefix}/package-lock.json', json.dumps(
+                {'name': f'anarqq-{name}', 'lockfileVersion': 3, 'seed': seed}))
+            archive.writestr(f'{prefix}/.env.example', 'PORT=5173\n')
+            for index in range(files):
+                text = ' '.join(rng.choice(words) for _ in range(per_file // 7))
+                archive.writestr(f'{prefix}/src/module-{index % 64}/file-{index}.js', text)
+        return path.read_bytes()
+
+    def start_server(self):
+        ArchiveHandler.archives = {
+            '/demo.zip': self.build_archive('demo', self.args.files, self.args.size_mb, 1),
+            '/core.zip': self.build_archive('core', self.args.files, self.args.size_mb, 2),
+        }
+        ArchiveHandler.bandwidth = self.args.bandwidth_mbps * 1024 * 1024 / 8
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ArchiveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def write_shims(self) -> Path:
+        shim_dir = self.workdir / 'bin'
+        shim_dir.mkdir()
+        for name, body in SHIMS.items():
+            script = shim_dir / f'{name}.py'
+            script.write_text(body, encoding='utf-8')
+            if os.name == 'nt':
+                (shim_dir / f'{name}.cmd').write_text(f'@"{sys.executable}" "{script}" %*\n')
+            else:
+                launcher = shim_dir / name
+                launcher.write_text(f'#!{sys.executable}\nexec(open({str(script)!r}).read())\n')
+                launcher.chmod(0o755)
+        return shim_dir
+
+    def run(self) -> dict:
+        base_url = self.start_server()
+        shim_dir = self.write_shims()
+        env = dict(os.environ)
+        # Only the shims are visible, so no real git, npm, node or docker takes part
+        env['PATH'] = str(shim_dir)
+        env.update({'BENCH_GIT_SECONDS': str(self.args.git_latency),
+                    'BENCH_NPM_SECONDS': str(self.args.npm_latency),
+                    'BENCH_BUILD_SECONDS': str(self.args.build_latency),
+                    'BENCH_NPM_PACKAGES': str(self.args.npm_packages)})
+
+        results = {}
+        for scenario in self.args.scenarios:
+            samples = []
+            for run in range(self.args.runs):
+                if scenario in ('faults', 'extract'):
+                    runner = self.run_faults if scenario == 'faults' else self.run_extract
+                    samples.append(runner(base_url, run))
+                    print(f"  {scenario} run {run + 1}/{self.args.runs}: {samples[-1]['total_seconds']:.2f}s")
+                    continue
+                install_dir = self.workdir / f'{scenario}-{run}'
+                cache_dir = self.workdir / f'{scenario}-{run}-cache'
+                spec = {'install_dir': str(install_dir), 'cache_dir': str(cache_dir),
+                        'demo_zip': f'{base_url}/demo.zip', 'core_zip': f'{base_url}/core.zip',
+                        'install_core': not self.args.demo_only,
+                        'download_connections': self.args.download_connections,
+                        'result': str(self.workdir / f'{scenario}-{run}.json')}
+                if scenario == 'warm':
+                    # Prime the installation, then measure the no-op reinstall
+                    self.run_child(spec, env)
+                samples.append(self.run_child(spec, env))
+                print(f"  {scenario} run {run + 1}/{self.args.runs}: {samples[-1]['total_seconds']:.2f}s")
+            results[scenario] = self.summarize(scenario, samples)
+        return results
+
+    def run_child(self, spec: dict, env: dict) -> dict:
+        spec_file = self.workdir / 'spec.json'
+        spec_file.write_text(json.dumps(spec), encoding='utf-8')
+        subprocess.run([sys.executable, __file__, '--run-child', str(spec_file)], env=env, check=True)
+        result = json.loads(Path(spec['result']).read_text(encoding='utf-8'))
+        if not result['success']:
+            raise RuntimeError(f"Benchmark install failed, see {spec['install_dir']}/install.log")
+        return result
+
+    def run_faults(self, base_url: str, run: int) -> dict:
+        """Download the demo archive through injected faults over one and several connections
+
+        Enough drops land on every segment to outlast the retry budget unless
+        progress renews it; a server that ignores every byte range must still
+        deliver the file, and one that only sends empty ranges must make the
+        download fail rather than spin.
+        """
+        installer_module = load_installer()
+        data = ArchiveHandler.archives['/demo.zip']
+        expected = hashlib.sha256(data).hexdigest()
+        many = self.args.download_connections if self.args.download_connections > 1 else 4
+        # Keep retry backoff short; the schedule of faults is what is under test.
+        # Segments are shrunk so that even a small archive is split 'many' ways.
+        installer_module.CONFIG.update({
+            'http_backoff_base': 0.01, 'http_backoff_max': 0.1,
+            'min_segment_size': min(installer_module.CONFIG['min_segment_size'], len(data) // many),
+        })
+        forever = 10 ** 9
+
+        def download(case: str, connections: int, faults: dict):
+            ArchiveHandler.faults = dict(faults)
+            installer = installer_module.AnarQQInstaller()
+            installer.echo = False
+            installer.set_install_dir(self.workdir / f'faults-{run}-{case}-{connections}')
+            installer.install_dir.mkdir(parents=True)
+            installer.download_connections = connections
+            destination = installer.install_dir / 'demo.zip'
+            # A download that never gives up is cancelled and reported as hung
+            watchdog = threading.Timer(60, installer.cancel_event.set)
+            watchdog.start()
+            started = time.perf_counter()
+            try:
+                result = installer.download_file(f'{base_url}/demo.zip', destination, 'demo archive')
+            except installer_module.InstallCancelled:
+                raise RuntimeError(f"Download over {connections} connections hung, "
+                                   f"see {installer.install_dir}/install.log")
+            except Exception as e:
+                result = e
+            finally:
+                watchdog.cancel()
+                installer.http.close()
+                injected = sum(faults.values()) - sum(ArchiveHandler.faults.values())
+                ArchiveHandler.faults = {}
+            return destination, result, time.perf_counter() - started, injected
+
+        cases = {'flaky': {'unavailable': 2, 'drop': 6 * many, 'empty_range': 1},
+                 'unranged': {'drop': 1, 'ignore_ranges': forever}}
+        sample = {'total_seconds': 0.0, 'faults_injected': 0}
+        for case, faults in cases.items():
+            for connections in (1, many):
+                destination, result, seconds, injected = download(case, connections, faults)
+                if isinstance(result, Exception):
+                    raise RuntimeError(f"{case} download over {connections} connections failed: {result}")
+                if destination.read_bytes() != data or result['sha256'] != expected:
+                    raise RuntimeError(f"{case} download over {connections} connections is corrupted")
+                sample[f'{case}:{connections}_connections_seconds'] = round(seconds, 3)
+                sample['total_seconds'] += seconds
+                sample['faults_injected'] += injected
+        _, result, seconds, _ = download('empty', many, {'empty_range': forever})
+        if not isinstance(result, OSError):
+            raise RuntimeError(f"Download from a server sending only empty ranges did not fail: {result}")
+        sample['empty_ranges_seconds'] = round(seconds, 3)
+        sample['total_seconds'] = round(sample['total_seconds'] + seconds, 3)
+        return sample
+
+    def run_extract(self, base_url: str, run: int) -> dict:
+        """Time the three ways the installer extracts a ZIP with many files
+
+        Installs stream archives through StreamingZipExtractor as they
+        download; extract_zip only runs for archives the streaming extractor
+        cannot handle, and hands them to a process pool above
+        parallel_extract_min_files and parallel_extract_min_mb. The pool gets
+        one worker per CPU (2 to 8), so a ratio above 1 on a small host is
+        expected.
+        """
+        archive = self.workdir / 'extract.zip'
+        if not archive.exists():
+            self.build_archive('extract', self.args.files * 4, self.args.size_mb * 4, 3)
+        installer_module = load_installer()
+        installer = installer_module.AnarQQInstaller()
+        installer.echo = False
+        installer.set_install_dir(self.workdir / f'extract-{run}')
+        installer.install_dir.mkdir(parents=True)
+        messages = []
+        installer.log = lambda message, level='INFO': messages.append(message)
+        workers = max(2, min(8, os.cpu_count() or 1))
+        sample = {'total_seconds': 0.0}
+
+        started = time.perf_counter()
+        extractor = installer_module.StreamingZipExtractor(installer.install_dir / 'streaming')
+        with open(archive, 'rb') as f:
+            for chunk in iter(lambda: f.read(256 * 1024), b''):
+                extractor.feed(chunk)
+        extractor.close()
+        if extractor.unsupported:
+            raise RuntimeError(f"Streaming extractor rejected the archive ({extractor.unsupported})")
+        sample['streaming_seconds'] = round(time.perf_counter() - started, 3)
+        # Each mode starts without the previous one's files still being written back
+        shutil.rmtree(installer.install_dir / 'streaming')
+
+        for mode, count in (('serial', 1), ('parallel', workers)):
+            installer.tuning = dict(installer.tuning, extract_workers=count)
+            started = time.perf_counter()
+            installer.extract_zip(archive, installer.install_dir / mode, strip_components=1)
+            sample[f'{mode}_seconds'] = round(time.perf_counter() - started, 3)
+            shutil.rmtree(installer.install_dir / mode)
+        if not any('worker processes' in message for message in messages):
+            raise RuntimeError(f"extract_zip did not use its process pool: {messages}")
+        # Below 1 the pool pays off on this host
+        sample['parallel_to_serial_ratio'] = round(sample['parallel_seconds'] / sample['serial_seconds'], 3)
+        sample['total_seconds'] = round(sum(sample[f'{mode}_seconds']
+                                            for mode in ('streaming', 'serial', 'parallel')), 3)
+        shutil.rmtree(installer.install_dir, ignore_errors=True)
+        return sample
+
+    def summarize(self, scenario: str, samples: list) -> dict:
+        """Median of every metric across runs"""
+        if scenario in GATED_RATIOS:
+            # Figures from one run, so they agree with its ratio
+            ranked = sorted(samples, key=lambda sample: sample[GATED_RATIOS[scenario]])
+            return dict(ranked[(len(ranked) - 1) // 2])
+        metrics = {}
+        for sample in samples:
+            for name, value in sample.items():
+                if name not in ('success', 'phases'):
+                    metrics.setdefault(name, []).append(value)
+        for sample in samples:
+            for phase, seconds in sample.get('phases', {}).items():
+                metrics.setdefault(f'phase:{phase}', []).append(seconds)
+        return {name: (int(statistics.median_low(values)) if all(isinstance(v, int) for v in values)
+                       else round(statistics.median(values), 3))
+                for name, values in metrics.items()}
+
+    def compare(self, results: dict, baseline: dict) -> list:
+        """Metrics that got worse than the baseline by more than the threshold"""
+        regressions = []
+        for scenario, metrics in results.items():
+            for name, value in metrics.items():
+                reference = baseline.get('results', {}).get(scenario, {}).get(name)
+                if reference is None or GATED_RATIOS.get(scenario, name) != name:
+                    continue
+                threshold = self.args.threshold
+                if scenario in GATED_RATIOS:
+                    threshold = max(threshold, RATIO_THRESHOLD)
+                limit = reference * (1 + threshold)
+                if name.startswith('phase:') or name.endswith('_seconds'):
+                    limit = max(limit, reference + MIN_GATED_SECONDS)
+                if value > limit:
+                    regressions.append(f"{scenario} {name}: {value} > {reference} "
+                                       f"(+{(value / reference - 1) * 100 if reference else 0:.0f}%)")
+        return regressions
+
+
+def load_installer():
+    """Import a fresh copy of install-anarqq-demo.py as a module"""
+    module_spec = importlib.util.spec_from_file_location('anarqq_installer', INSTALLER)
+    installer_module = importlib.util.module_from_spec(module_spec)
+    # Worker processes look extract_zip_members up by module name
+    sys.modules['anarqq_installer'] = installer_module
+    module_spec.loader.exec_module(installer_module)
+    return installer_module
+
+
+def run_child(spec_file: str):
+    """Run one installation in this process and write its figures"""
+    spec = json.loads(Path(spec_file).read_text(encoding='utf-8'))
+    installer_module = load_installer()
+
+    installer_module.CONFIG.update({'demo_zip': spec['demo_zip'], 'core_zip': spec['core_zip']})
+    installer = installer_module.AnarQQInstaller()
+    installer.echo = False
+    installer.set_install_dir(Path(spec['install_dir']))
+    installer.cache_dir = Path(spec['cache_dir'])
+    installer.download_connections = spec['download_connections']
+    success = installer.install(spec['install_core'])
+
+    report = json.loads(installer.metrics_file.read_text(encoding='utf-8'))
+    phases = report['phases'].values()
+    if sys.platform == 'win32':
+        installer_rss_mb = 0.0
+    else:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        installer_rss_mb = rss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    result = {
+        'success': success,
+        'total_seconds': report['total_seconds'],
+        'phases': {name: phase['wall_seconds'] for name, phase in report['phases'].items()},
+        'bytes_downloaded': sum(phase['bytes_downloaded'] for phase in phases),
+        'bytes_written': sum(phase['bytes_written'] for phase in phases),
+        'installer_rss_mb': round(installer_rss_mb, 1),
+        'peak_child_rss_mb': max((phase['peak_child_rss_mb'] for phase in phases), default=0.0),
+    }
+    Path(spec['result']).write_text(json.dumps(result), encoding='utf-8')
+
+
+def print_report(results: dict, baseline: dict):
+    for scenario, metrics in results.items():
+        reference = baseline.get('results', {}).get(scenario, {})
+        print(f"\n📊 {scenario}")
+        for name, value in metrics.items():
+            previous = reference.get(name)
+            delta = f"  ({(value / previous - 1) * 100:+.0f}% vs baseline)" if previous else ""
+            print(f"  {name:<32} {value:>14}{delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark install-anarqq-demo.py against local stand-ins')
+    parser.add_argument('--runs', type=int, default=3, help='installations per scenario (median is reported)')
+    parser.add_argument('--scenarios', nargs='+', choices=['cold', 'warm', 'faults', 'extract'],
+                        default=['cold', 'warm', 'faults', 'extract'],
+                        help='cold: empty install and cache dirs; warm: rerun over an existing install; '
+                             'faults: downloads through dropped, empty, unranged and 503 responses; '
+                             'extract: streaming, serial and process-pool extraction of 4x --files')
+    parser.add_argument('--files', type=int, default=1500, help='files in each synthetic archive')
+    parser.add_argument('--size-mb', type=float, default=12, help='uncompressed size of each archive')
+    parser.add_argument('--demo-only', action='store_true', help='skip the core repository')
+    parser.add_argument('--download-connections', type=int, default=1,
+                        help='installer download connections (0: tuned)')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0, help='throttle the server (0: unlimited)')
+    parser.add_argument('--git-latency', type=float, default=0.2, help='seconds before the git shim fails')
+    parser.add_argument('--npm-latency', type=float, default=1.0, help='seconds npm ci/install takes')
+    parser.add_argument('--npm-packages', type=int, default=200, help='packages npm ci/install writes')
+    parser.add_argument('--build-latency', type=float, default=0.5, help='seconds npm run build takes')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='baseline results file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed regression over the baseline (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary install directories')
+    parser.add_argument('--run-child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_child:
+        run_child(args.run_child)
+        return
+
+    baseline_file = Path(args.baseline)
+    baseline = json.loads(baseline_file.read_text(encoding='utf-8')) if baseline_file.exists() else {}
+
+    benchmark = InstallerBenchmark(args)
+    print(f"🚀 Benchmarking {INSTALLER.name} in {benchmark.workdir}")
+    try:
+        results = benchmark.run()
+    finally:
+        benchmark.close()
+
+    print_report(results, baseline)
+    document = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('baseline', 'threshold', 'update_baseline', 'output', 'keep', 'run_child')},
+        'host': {'platform': sys.platform, 'python': sys.version.split()[0], 'cpus': os.cpu_count()},
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(document, indent=2) + '\n', encoding='utf-8')
+    if args.update_baseline:
+        baseline_file.write_text(json.dumps(document, indent=2) + '\n', encoding='utf-8')
+        print(f"\n✅ Baseline written to {baseline_file}")
+        return
+
+    if not baseline:
+        print("\nℹ️ No baseline to compare against; run with --update-baseline to create one")
+        return
+    if baseline.get('settings') != document['settings']:
+        print("\n⚠️ Settings differ from the baseline's; comparisons may not be meaningful")
+    regressions = benchmark.compare(results, baseline)
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("\n🎉 No metric regressed past the baseline")
+
+
+if __name__ == '__main__':
+    main()
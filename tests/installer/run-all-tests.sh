@@ -150,6 +150,7 @@ generate_test_report() {
 | Suite | Status | Description |
 |-------|--------|-------------|
 | Unit Tests | $([ -f "$SCRIPT_DIR/unit/test-installer-functions.sh" ] && echo "✅ Available" || echo "❌ Missing") | Tests individual installer functions |
+| Python Installer Tests | $([ -f "$SCRIPT_DIR/unit/test_python_installer.py" ] && echo "✅ Available" || echo "❌ Missing") | Tests install-anarqq-demo.py functions |
 | Integration Tests | $([ -f "$SCRIPT_DIR/integration/test-installation-flows.sh" ] && echo "✅ Available" || echo "❌ Missing") | Tests complete installation flows |
 | Platform Tests | $([ -f "$SCRIPT_DIR/platform/test-cross-platform.sh" ] && echo "✅ Available" || echo "❌ Missing") | Tests cross-platform compatibility |
 
@@ -216,6 +217,14 @@ main() {
     
     echo ""
     
+    # Python Installer Unit Tests
+    run_test_suite \
+        "Python Installer Tests" \
+        "$SCRIPT_DIR/unit/test_python_installer.py" \
+        "Testing install-anarqq-demo.py functions"
+    
+    echo ""
+    
     # Integration Tests
     run_test_suite \
         "Integration Tests" \
@@ -260,6 +269,10 @@ case "${1:-}" in
             "Unit Tests" \
             "$SCRIPT_DIR/unit/test-installer-functions.sh" \
             "Testing individual installer functions"
+        run_test_suite \
+            "Python Installer Tests" \
+            "$SCRIPT_DIR/unit/test_python_installer.py" \
+            "Testing install-anarqq-demo.py functions"
         ;;
     "integration")
         run_test_suite \